@@ -1,23 +1,39 @@
-from flask import Blueprint, request, jsonify, g
-from models import data_base, Article, Comment
+import json
+from collections import Counter
+from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy import insert
+from models import data_base, Article, Comment, Category
+from models import ARTICLE_FIELDS, ARTICLE_SUMMARY_FIELDS, summarize
+from sqlalchemy.orm import defer
 from models import User
-from werkzeug.security import check_password_hash
 from jwt_util import jwt_manager
+from pagination import keyset_paginate, page_max
+from search import article_search
+from streaming import stream_json, stream_ndjson
+from response_cache import response_cache
+from hashing import HashingQueueFull
+from comment_batcher import comment_batcher, CommentQueueFull, CommentRejected
+from middleware import jwt_required
+from rate_limit import rate_limiter, RateLimitExceeded
+from replica import replica_router
 
 api_bp = Blueprint('api', __name__)
 
 def validate_article(data):
     errors = []
 
-    if not data.get('title') or not data['title'].strip():
+    if not isinstance(data.get('title'), str) or not data['title'].strip():
         errors.append('Заголовок не может быть пустым')
     
-    if not data.get('text') or not data['text'].strip():
+    if not isinstance(data.get('text'), str) or not data['text'].strip():
         errors.append('Текст статьи не может быть пустым')
+
+    if data.get('category') is not None and not isinstance(data['category'], str):
+        errors.append('Категория должна быть строкой')
     
     return errors
 
-def validate_comment(data):
+def validate_comment(data, check_article=True):
     errors = []
 
     if not data.get('text') or not data['text'].strip():
@@ -25,7 +41,9 @@ def validate_comment(data):
     
     if not data.get('article_id'):
         errors.append('ID статьи не может быть пустым')
-    else:
+    elif isinstance(data['article_id'], bool) or not str(data['article_id']).isdigit():
+        errors.append('ID статьи должен быть числом')
+    elif check_article:
         article_id = data['article_id']
         article = data_base.session.get(Article, article_id) 
         if not article:
@@ -33,6 +51,33 @@ def validate_comment(data):
     
     return errors
 
+@api_bp.errorhandler(HashingQueueFull)
+def hashing_queue_full(e):
+    response = jsonify({
+        'success': False,
+        'error': 'Сервер перегружен, повторите попытку позже'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+@api_bp.errorhandler(RateLimitExceeded)
+def rate_limit_exceeded(e):
+    response = jsonify({
+        'success': False,
+        'error': str(e)
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+@api_bp.errorhandler(CommentQueueFull)
+def comment_queue_full(e):
+    response = jsonify({
+        'success': False,
+        'error': 'Сервер перегружен, повторите попытку позже'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @api_bp.after_request
 def add_token_headers(response):
     if (response.status_code in [200, 201] and 
@@ -50,6 +95,7 @@ def add_token_headers(response):
     return response
 
 @api_bp.route('/api/auth/register', methods=['POST'])
+@rate_limiter.limit('5/minute')
 def register():
     data = request.get_json()
     if not data:
@@ -95,6 +141,7 @@ def register():
     })
 
 @api_bp.route('/api/auth/login', methods=['POST'])
+@rate_limiter.limit('10/minute')
 def login():
     data = request.get_json()
     if not data:
@@ -113,11 +160,12 @@ def login():
         }), 400
     
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.hashed_password, password):
+    if not user or not user.check_password(password):
         return jsonify({
             'success': False,
             'error': 'Неверный email или пароль'
         }), 401
+    data_base.session.commit()
     
     access_token = jwt_manager.create_access_token(user.id, user.email)
     refresh_token = jwt_manager.create_refresh_token(user.id, user.email)
@@ -133,6 +181,7 @@ def login():
     })
 
 @api_bp.route('/api/auth/refresh', methods=['POST'])
+@rate_limiter.limit('30/minute')
 def refresh():
     data = request.get_json()
     if not data:
@@ -165,30 +214,71 @@ def refresh():
     })
 
 @api_bp.route('/api/articles', methods=['GET'])
+@response_cache.cached('article', 'user', 'comment')
 def get_articles():
+    if 'ids' in request.args:
+        return get_articles_by_ids(request.args['ids'])
+
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
     category = request.args.get('category', '')
     search = request.args.get('search', '')
-    order = request.args.get('order', 'desc')
-    
-    query = Article.query
+    order = request.args.get('order', 'rank' if search else 'desc')
+    cursor = request.args.get('cursor')
+    with_count = request.args.get('with_count', '1') != '0'
+    fields = None
+    if request.args.get('view') == 'summary':
+        fields = ARTICLE_SUMMARY_FIELDS
+    if request.args.get('fields'):
+        fields = [field for field in request.args['fields'].split(',') if field in ARTICLE_FIELDS]
+    
+    query = Article.with_author(loading=request.args.get('loading', 'joined'))
+    if fields is not None and 'text' not in fields:
+        query = query.options(defer(Article.text))
     
     if category:
         query = query.filter(Article.category == category)
     
+    rank = None
     if search:
-        query = query.filter(Article.title.ilike(f'%{search}%'))
+        query, rank = article_search.filter(query, search)
+
+    if cursor is not None:
+        try:
+            articles, next_cursor = keyset_paginate(
+                query, Article.date, Article.id,
+                cursor=cursor,
+                limit=max(1, min(limit, page_max(current_app.config))),
+                order=order
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        result = {
+            'success': True,
+            'next_cursor': next_cursor,
+            'articles': [article.to_dict(fields) for article in articles]
+        }
+        if with_count:
+            result['count'] = query.order_by(None).count()
+        return jsonify(result)
     
     if order == 'asc':
         query = query.order_by(Article.date.asc())
+    elif order == 'rank' and rank is not None:
+        query = query.order_by(rank.asc(), Article.date.desc())
     else:
         query = query.order_by(Article.date.desc())
 
     articles = query.paginate(
         page=page, 
         per_page=limit, 
-        error_out=False
+        max_per_page=page_max(current_app.config),
+        error_out=False,
+        count=with_count
     )
     
     return jsonify({
@@ -196,27 +286,99 @@ def get_articles():
         'count': articles.total,
         'page': page,
         'pages': articles.pages,
-        'articles': [article.to_dict() for article in articles.items]
+        'articles': [article.to_dict(fields) for article in articles.items]
+    })
+
+def get_articles_by_ids(raw_ids):
+    try:
+        ids = list(dict.fromkeys(int(id) for id in raw_ids.split(',') if id.strip()))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Параметр ids должен быть списком чисел через запятую'
+        }), 400
+
+    max_batch = current_app.config.get('ARTICLES_BATCH_MAX', 100)
+    if len(ids) > max_batch:
+        return jsonify({
+            'success': False,
+            'error': f'Можно запросить не более {max_batch} статей за раз'
+        }), 400
+
+    found = {}
+    if ids:
+        articles = Article.with_author().filter(Article.id.in_(ids)).all()
+        found = {article.id: article for article in articles}
+
+    return jsonify({
+        'success': True,
+        'count': len(found),
+        'articles': [found[id].to_dict() for id in ids if id in found],
+        'missing': [id for id in ids if id not in found]
     })
 
 @api_bp.route('/api/articles/<int:id>', methods=['GET'])
+@response_cache.cached('article', 'user', 'comment')
 def get_article(id):
     article = Article.query.get_or_404(id)
+    result = article.to_dict()
+
+    if 'comments' in request.args.get('include', '').split(','):
+        comments_limit = max(0, min(request.args.get('comments_limit', 5, type=int), 50))
+        result['comments'] = [comment.to_dict() for comment in article.latest_comments(comments_limit)]
+
     return jsonify({
         'success': True,
-        'article': article.to_dict()
+        'article': result
     }) 
 
+@api_bp.route('/api/categories', methods=['GET'])
+@response_cache.cached('article', 'category')
+def get_categories():
+    categories = Category.listed()
+    return jsonify({
+        'success': True,
+        'count': len(categories),
+        'categories': [category.to_dict() for category in categories]
+    })
+
 @api_bp.route('/api/comments', methods=['GET'])
 def get_comments():
-    comments = Comment.query.all()
-    return jsonify({
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor = request.args.get('cursor', '')
+    article_id = request.args.get('article_id', type=int)
+    author_name = request.args.get('author_name', '')
+    order = request.args.get('order', 'desc')
+
+    query = Comment.query
+
+    if article_id:
+        query = query.filter(Comment.article_id == article_id)
+
+    if author_name:
+        query = query.filter(Comment.author_name == author_name)
+
+    try:
+        comments, next_cursor = keyset_paginate(
+            query, Comment.date, Comment.id,
+            cursor=cursor,
+            limit=limit,
+            order=order
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    return stream_json({
         'success': True,
         'count': len(comments),
-        'comments': [comment.to_dict() for comment in comments]
-    })
+        'next_cursor': next_cursor
+    }, 'comments', comments)
 
 @api_bp.route('/api/comments/<int:id>', methods=['GET'])
+@response_cache.cached('comment')
 def get_comment(id):
     comment = Comment.query.get(id)
     if not comment:
@@ -234,29 +396,19 @@ def get_comment(id):
     })
 
 @api_bp.route('/api/auth/me', methods=['GET', 'OPTIONS'])
+@jwt_required
 def get_current_user():
     if request.method == 'OPTIONS':
         return jsonify({'success': True}), 200
     
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     return jsonify({
         'success': True,
         'user': request.current_user.to_dict()
     })
 
 @api_bp.route('/api/protected/articles', methods=['POST'])
+@jwt_required
 def create_article_jwt():
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     data = request.get_json()
     if not data:
         return jsonify({
@@ -274,8 +426,8 @@ def create_article_jwt():
     article = Article(
         title=data['title'].strip(),
         text=data['text'].strip(),
-        category=data.get('category', 'Общее').strip(),
-        author=request.current_user
+        category=(data.get('category') or 'Общее').strip(),
+        user_id=request.current_user.id
     )
 
     data_base.session.add(article)
@@ -287,21 +439,98 @@ def create_article_jwt():
         'article': article.to_dict()
     })
 
+@api_bp.route('/api/protected/articles/bulk', methods=['POST'])
+@jwt_required
+def bulk_import_articles():
+    chunk_size = current_app.config.get('BULK_IMPORT_CHUNK_SIZE', 500)
+    created = 0
+    errors = []
+    rows = []
+
+    def flush():
+        data_base.session.execute(insert(Article), rows)
+        connection = data_base.session.connection()
+        for name, count in Counter(row['category'] for row in rows).items():
+            Category.adjust(connection, name, count)
+        data_base.session.commit()
+        rows.clear()
+
+    for line_number, line in enumerate(request.stream, start=1):
+        line = line.decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+
+        try:
+            data = json.loads(line)
+        except ValueError:
+            errors.append({'line': line_number, 'errors': ['Строка должна быть JSON-объектом']})
+            continue
+
+        if not isinstance(data, dict):
+            errors.append({'line': line_number, 'errors': ['Строка должна быть JSON-объектом']})
+            continue
+
+        line_errors = validate_article(data)
+        if line_errors:
+            errors.append({'line': line_number, 'errors': line_errors})
+            continue
+
+        text = data['text'].strip()
+        rows.append({
+            'title': data['title'].strip(),
+            'text': text,
+            'category': (data.get('category') or 'Общее').strip(),
+            'user_id': request.current_user.id,
+            **summarize(text)
+        })
+        created += 1
+
+        if len(rows) >= chunk_size:
+            flush()
+
+    if rows:
+        flush()
+
+    return jsonify({
+        'success': not errors,
+        'message': f'Импортировано статей: {created}',
+        'created': created,
+        'errors': errors
+    })
+
+@api_bp.route('/api/articles/export', methods=['GET'])
+def export_articles():
+    def articles():
+        yield from data_base.session.execute(
+            Article.with_author(data_base.select(Article))
+            .order_by(Article.id)
+            .execution_options(yield_per=500)
+        ).scalars()
+
+    return stream_ndjson(articles())
+
 @api_bp.route('/api/auth/logout', methods=['POST'])
 def logout():
+    auth_header = request.headers.get('Authorization', '')
+    tokens = [auth_header.split(' ')[1]] if auth_header.startswith('Bearer ') else []
+
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        tokens.append(data['refresh_token'])
+
+    for token in tokens:
+        payload = jwt_manager.verify_token(token)
+        if payload:
+            jwt_manager.revoke_token(payload)
+
     return jsonify({
         'success': True,
         'message': 'Успешный выход из системы'
     })
 
 @api_bp.route('/api/protected/articles/<int:id>', methods=['PUT'])
+@jwt_required
 def update_article_jwt(id):
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     article = data_base.session.get(Article, id) 
     if not article:
         return jsonify({
@@ -309,7 +538,7 @@ def update_article_jwt(id):
             'error': 'Статья не найдена'
         }), 404
 
-    if article.author != request.current_user:
+    if article.user_id != request.current_user.id:
         return jsonify({
             'success': False,
             'error': 'У вас нет прав для редактирования этой статьи'
@@ -331,7 +560,7 @@ def update_article_jwt(id):
 
     article.title = data.get('title', article.title).strip()
     article.text = data.get('text', article.text).strip()
-    article.category = data.get('category', article.category).strip()
+    article.category = (data.get('category') or article.category or 'Общее').strip()
 
     data_base.session.commit()
     return jsonify({
@@ -341,16 +570,11 @@ def update_article_jwt(id):
     })
 
 @api_bp.route('/api/protected/articles/<int:id>', methods=['DELETE'])
+@jwt_required
 def delete_article_jwt(id):
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     article = Article.query.get_or_404(id)
     
-    if article.author != request.current_user:
+    if article.user_id != request.current_user.id:
         return jsonify({
             'success': False,
             'error': 'У вас нет прав для удаления этой статьи'
@@ -367,13 +591,9 @@ def delete_article_jwt(id):
     })
 
 @api_bp.route('/api/protected/comments', methods=['POST'])
+@jwt_required
+@rate_limiter.limit('30/minute', per='user')
 def create_comment_jwt():
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     data = request.get_json()
     
     if not data:
@@ -382,12 +602,32 @@ def create_comment_jwt():
             'error': 'Данные должны быть в формате JSON'
         }), 400
     
-    errors = validate_comment(data)
+    errors = validate_comment(data, check_article=not comment_batcher.enabled)
     if errors:
         return jsonify({
             'success': False,
             'errors': errors
         }), 400
+
+    if comment_batcher.enabled:
+        try:
+            result = comment_batcher.submit(
+                data['text'].strip(),
+                request.current_user.email,
+                int(data['article_id'])
+            )
+        except CommentRejected as e:
+            return jsonify({
+                'success': False,
+                'errors': e.errors
+            }), 400
+        replica_router.stick()
+
+        return jsonify({
+            'success': True,
+            'message': 'Комментарий успешно создан',
+            'comment': result
+        }), 201
     
     comment = Comment(
         text=data['text'].strip(),
@@ -405,13 +645,8 @@ def create_comment_jwt():
     }), 201
 
 @api_bp.route('/api/protected/comments/<int:id>', methods=['PUT'])
+@jwt_required
 def update_comment_jwt(id):
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     comment = Comment.query.get_or_404(id)
     
     if comment.author_name != request.current_user.email:
@@ -447,13 +682,8 @@ def update_comment_jwt(id):
     })
 
 @api_bp.route('/api/protected/comments/<int:id>', methods=['DELETE'])
+@jwt_required
 def delete_comment_jwt(id):
-    if not hasattr(request, 'current_user') or not request.current_user:
-        return jsonify({
-            'success': False,
-            'error': 'Требуется авторизация'
-        }), 401
-    
     comment = Comment.query.get_or_404(id)
     
     if comment.author_name != request.current_user.email:
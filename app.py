@@ -1,80 +1,157 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import os
+import click
+from flask import Flask
 from api import api_bp
-from flask import Flask, render_template, request, flash, redirect, url_for, make_response
-from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from datetime import datetime, date
-import re
-from models import data_base, User, Article, Comment
-from werkzeug.security import generate_password_hash, check_password_hash
-from urllib.parse import unquote
-from jwt_util import jwt_manager
-from middleware import jwt_middleware
-from flask_cors import CORS
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your-secret-key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///blog.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-data_base.init_app(app)
-
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["http://localhost:3000", "http://localhost:5173"],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Authorization", "Content-Type"]
+from models import data_base, User, Article, migrate_db
+from werkzeug.security import generate_password_hash
+import sqlite_profile
+from json_provider import FastJSONProvider
+from token_cache import token_cache
+from response_cache import response_cache
+from hashing import password_hasher
+from comment_batcher import comment_batcher
+from rate_limit import rate_limiter
+from replica import replica_router
+from search import article_search
+
+IMPORT_TIME_MS = (time.perf_counter() - IMPORT_STARTED) * 1000
+
+DEFAULT_CONFIG = {
+    'SECRET_KEY': 'your-secret-key',
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///blog.db',
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    'HTML_VIEWS': True,
+    'AUTO_MIGRATE': True,
+    'CORS_RESOURCES': {
+        r"/api/*": {
+            "origins": ["http://localhost:3000", "http://localhost:5173"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Authorization", "Content-Type"]
+        }
+    },
+    'COMMENT_BATCHING': os.environ.get('BLOG_COMMENT_BATCHING') == '1',
+    'INSTRUMENTATION_ENABLED': os.environ.get('BLOG_INSTRUMENTATION') == '1'
+}
+
+
+def create_app(config=None):
+    started = time.perf_counter()
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
+
+    sqlite_profile.init_app(app)
+    replica_router.init_app(app)
+
+    if app.config['AUTO_MIGRATE']:
+        with app.app_context():
+            init_schema()
+
+    if app.config['CORS_RESOURCES']:
+        from flask_cors import CORS
+        CORS(app, resources=app.config['CORS_RESOURCES'])
+
+    app.register_blueprint(api_bp)
+    if app.config['HTML_VIEWS']:
+        import views
+        views.init_app(app)
+
+    password_hasher.init_app(app)
+    response_cache.init_app(app)
+    comment_batcher.init_app(app)
+    rate_limiter.init_app(app)
+    app.cli.command('init-db')(init_db_command)
+
+    startup = {
+        'import_ms': round(IMPORT_TIME_MS, 3),
+        'create_app_ms': round((time.perf_counter() - started) * 1000, 3)
     }
-})
+    app.extensions['startup'] = startup
+
+    if app.config['INSTRUMENTATION_ENABLED']:
+        from instrumentation import instrumentation
+        instrumentation.init_app(app)
+        instrumentation.register_collector('startup', lambda: startup)
+        instrumentation.register_collector('token_cache', token_cache.stats)
+        instrumentation.register_collector('response_cache', response_cache.stats)
+        instrumentation.register_collector('password_hasher', password_hasher.stats)
+        instrumentation.register_collector('comment_batcher', comment_batcher.stats)
+        instrumentation.register_collector('rate_limiter', rate_limiter.stats)
+        instrumentation.register_collector('replica_router', replica_router.stats)
+        if app.config['HTML_VIEWS']:
+            from fragment_cache import fragment_cache
+            instrumentation.register_collector('fragment_cache', fragment_cache.stats)
+
+    app.logger.info('Холодный старт: импорт %.1f мс, create_app %.1f мс',
+                    startup['import_ms'], startup['create_app_ms'])
+    return app
 
-app.before_request(jwt_middleware)
 
-app.register_blueprint(api_bp)
+def init_schema():
+    data_base.create_all(bind_key=None)
+    migrate_db()
+    article_search.create_index()
+
 
 def init_db():
-    with app.app_context():
-        data_base.create_all() 
-        
-        test_user = User.query.filter_by(email='developer@test.com').first()
-        
-        if not test_user:
-            test_user = User(
-                name='Разработчик', 
-                email='developer@test.com',
-                hashed_password=generate_password_hash('123456')
-            )
-            data_base.session.add(test_user)
-            data_base.session.commit()
-            
-            articles_data = [
-                {
-                    'title': 'Первая новость',
-                    'text': 'Текст первой новости',
-                    'category': 'Общее'
-                },
-                {
-                    'title': 'Вторая новость',
-                    'text': 'Текст второй новости', 
-                    'category': 'Наука и технологии'
-                },
-                {
-                    'title': 'Третья новость', 
-                    'text': 'Текст третьей новости',
-                    'category': 'Культура'
-                }
-            ]
-                
-            for article_data in articles_data:
-                if not Article.query.filter_by(title=article_data['title']).first():
-                    article = Article(
-                        title=article_data['title'],
-                        text=article_data['text'],
-                        category=article_data['category'],
-                        author=test_user  
-                    )
-                    data_base.session.add(article)
-                
-            data_base.session.commit()
+    init_schema()
+
+    test_user = User.query.filter_by(email='developer@test.com').first()
+
+    if not test_user:
+        test_user = User(
+            name='Разработчик',
+            email='developer@test.com',
+            hashed_password=generate_password_hash('123456')
+        )
+        data_base.session.add(test_user)
+        data_base.session.commit()
+
+        articles_data = [
+            {
+                'title': 'Первая новость',
+                'text': 'Текст первой новости',
+                'category': 'Общее'
+            },
+            {
+                'title': 'Вторая новость',
+                'text': 'Текст второй новости',
+                'category': 'Наука и технологии'
+            },
+            {
+                'title': 'Третья новость',
+                'text': 'Текст третьей новости',
+                'category': 'Культура'
+            }
+        ]
+
+        for article_data in articles_data:
+            if not Article.query.filter_by(title=article_data['title']).first():
+                article = Article(
+                    title=article_data['title'],
+                    text=article_data['text'],
+                    category=article_data['category'],
+                    author=test_user
+                )
+                data_base.session.add(article)
+
+        data_base.session.commit()
+
+
+def init_db_command():
+    """Добавить тестовые данные."""
+    init_db()
+    click.echo('Тестовые данные добавлены')
+
 
 if __name__ == '__main__':
-    with app.app_context():
-        init_db()
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app = create_app()
+    print(f"Холодный старт: импорт {app.extensions['startup']['import_ms']} мс, "
+          f"create_app {app.extensions['startup']['create_app_ms']} мс")
+    app.run(debug=True, port=5000)
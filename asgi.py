@@ -0,0 +1,9 @@
+from app import create_app
+from async_api import AsyncAPI
+
+app = create_app()
+application = AsyncAPI(app)
+
+if app.config['INSTRUMENTATION_ENABLED']:
+    from instrumentation import instrumentation
+    instrumentation.register_collector('async_api', application.stats)
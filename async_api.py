@@ -0,0 +1,169 @@
+import math
+import re
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+from werkzeug.http import parse_etags
+from models import data_base, Article, Category
+from response_cache import response_cache
+from pagination import page_max
+import sqlite_profile
+
+ARTICLE_LIST_ARGS = {'page', 'limit', 'category', 'order', 'with_count'}
+
+
+def _int_arg(args, name, default):
+    try:
+        return int(args.get(name, default))
+    except ValueError:
+        return default
+
+
+class AsyncAPI:
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.routes = [
+            (re.compile(r'^/api/articles$'), self.get_articles, ('article', 'user', 'comment')),
+            (re.compile(r'^/api/articles/(\d+)$'), self.get_article, ('article', 'user', 'comment')),
+            (re.compile(r'^/api/categories$'), self.get_categories, ('article', 'category'))
+        ]
+        self.served = 0
+        self.delegated = 0
+
+        with app.app_context():
+            url = data_base.engine.url
+        if not sqlite_profile.is_file_database(str(url)):
+            raise ValueError('Асинхронный режим требует файловой базы SQLite')
+
+        self.engine = create_async_engine(url.set(drivername='sqlite+aiosqlite'),
+                                          **sqlite_profile.pool_options(app))
+        event.listen(self.engine.sync_engine, 'connect',
+                     sqlite_profile.connect_listener(app, str(url)))
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for pattern, handler, tables in self.routes:
+                match = pattern.match(scope['path'])
+                if match and await self.serve(scope, send, handler, tables, *match.groups()):
+                    self.served += 1
+                    return
+
+        self.delegated += 1
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def serve(self, scope, send, handler, tables, *params):
+        query_string = scope['query_string'].decode('utf-8')
+        args = {key: values[0] for key, values in parse_qs(query_string, keep_blank_values=True).items()}
+        headers = dict(scope['headers'])
+
+        etag = response_cache.etag(tables, path=f"{scope['path']}?{query_string}")
+        if b'if-none-match' in headers and parse_etags(headers[b'if-none-match'].decode('latin-1')).contains(etag):
+            response_cache.mark_not_modified()
+            await self.respond(send, 304, b'', etag)
+            return True
+
+        entry = response_cache.lookup(etag)
+        if entry is not None:
+            body = entry[0]
+        else:
+            payload = await handler(args, *params)
+            if payload is None:
+                return False
+            body = (self.app.json.dumps(payload) + '\n').encode('utf-8')
+            response_cache.store(etag, body, 'application/json')
+
+        await self.respond(send, 200, body if scope['method'] == 'GET' else b'', etag, len(body))
+        return True
+
+    async def respond(self, send, status, body, etag, length=None):
+        headers = [
+            (b'etag', f'"{etag}"'.encode('latin-1')),
+            (b'cache-control', b'no-cache')
+        ]
+        if status == 200:
+            headers += [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body) if length is None else length).encode('latin-1'))
+            ]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def get_articles(self, args):
+        if set(args) - ARTICLE_LIST_ARGS:
+            return None
+
+        page = _int_arg(args, 'page', 1)
+        limit = _int_arg(args, 'limit', 10)
+        if page < 1 or limit < 1:
+            return None
+        limit = min(limit, page_max(self.app.config))
+        category = args.get('category', '')
+        with_count = args.get('with_count', '1') != '0'
+
+        filters = [Article.category == category] if category else []
+        order = Article.date.asc() if args.get('order') == 'asc' else Article.date.desc()
+        query = select(Article).options(joinedload(Article.author)).where(*filters).order_by(order)
+
+        async with self.session() as session:
+            articles = (await session.scalars(query.limit(limit).offset((page - 1) * limit))).all()
+            total = None
+            if with_count:
+                total = await session.scalar(select(func.count(Article.id)).where(*filters))
+
+        return {
+            'success': True,
+            'count': total,
+            'page': page,
+            'pages': math.ceil(total / limit) if total else 0,
+            'articles': [article.to_dict() for article in articles]
+        }
+
+    async def get_article(self, args, id):
+        if args:
+            return None
+
+        async with self.session() as session:
+            article = await session.get(Article, int(id), options=[joinedload(Article.author)])
+        if article is None:
+            return None
+
+        return {
+            'success': True,
+            'article': article.to_dict()
+        }
+
+    async def get_categories(self, args):
+        async with self.session() as session:
+            categories = (await session.scalars(
+                select(Category).where(Category.article_count > 0).order_by(Category.name)
+            )).all()
+
+        return {
+            'success': True,
+            'count': len(categories),
+            'categories': [category.to_dict() for category in categories]
+        }
+
+    def stats(self):
+        return {
+            'served': self.served,
+            'delegated': self.delegated
+        }
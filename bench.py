@@ -0,0 +1,452 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event, insert
+from werkzeug.security import generate_password_hash
+from app import create_app
+from comment_batcher import comment_batcher
+from response_cache import response_cache
+from models import data_base, User, Article, Comment, migrate_db, summarize
+from search import article_search
+import json_provider
+from json_provider import FastJSONProvider
+
+PASSWORD = '123456'
+CATEGORIES = ['Общее', 'Наука и технологии', 'Культура', 'Спорт', 'Политика']
+
+_local = threading.local()
+
+
+def create_bench_app(db_path):
+    return create_app({
+        'SECRET_KEY': 'bench-secret-key',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'HTML_VIEWS': False,
+        'AUTO_MIGRATE': False,
+        'CORS_RESOURCES': None,
+        'RATELIMIT_ENABLED': False,
+        'INSTRUMENTATION_ENABLED': False
+    })
+
+
+def seed(app, users, articles, comments, seed_value):
+    rng = random.Random(seed_value)
+    hashed_password = generate_password_hash(PASSWORD)
+    start = datetime(2024, 1, 1)
+
+    with app.app_context():
+        data_base.create_all()
+        session = data_base.session
+
+        session.execute(insert(User), [{
+            'name': f'Пользователь {i}',
+            'email': f'user{i}@bench.test',
+            'hashed_password': hashed_password,
+            'date': start
+        } for i in range(users)])
+
+        texts = [
+            ' '.join(rng.choice(['новость', 'наука', 'город', 'спорт', 'культура']) for _ in range(200))
+            for _ in range(articles)
+        ]
+        session.execute(insert(Article), [{
+            'title': f'Статья {i}',
+            'text': texts[i],
+            'category': rng.choice(CATEGORIES),
+            'user_id': rng.randint(1, users),
+            'date': start + timedelta(minutes=i),
+            **summarize(texts[i])
+        } for i in range(articles)])
+
+        session.execute(insert(Comment), [{
+            'text': f'Комментарий {i}',
+            'article_id': rng.randint(1, articles),
+            'author_name': f'user{rng.randint(0, users - 1)}@bench.test',
+            'date': start + timedelta(minutes=i)
+        } for i in range(comments)])
+
+        session.commit()
+        Article.recount_comments()
+        migrate_db()
+        article_search.create_index()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def bench_serialization(app, iterations, page_size=100):
+    with app.app_context():
+        articles = Article.with_author().order_by(Article.id).limit(page_size).all()
+        payload = {
+            'success': True,
+            'count': len(articles),
+            'articles': [article.to_dict() for article in articles]
+        }
+
+    results = {'orjson': json_provider.orjson is not None, 'page_size': len(payload['articles'])}
+    for name, provider in (('stdlib', DefaultJSONProvider(app)), ('fast', FastJSONProvider(app))):
+        body = provider.dumps(payload, separators=(',', ':'))
+        started = time.perf_counter()
+        for _ in range(iterations):
+            provider.dumps(payload, separators=(',', ':'))
+        elapsed = time.perf_counter() - started
+        size = len(body.encode('utf-8'))
+        results[name] = {
+            'pages_per_s': round(iterations / elapsed, 2),
+            'mb_per_s': round(size * iterations / elapsed / 1024 / 1024, 2),
+            'page_bytes': size
+        }
+    return results
+
+
+def bench_comment_inserts(app, concurrency, per_worker, articles):
+    client = app.test_client()
+    tokens = client.post('/api/auth/login', json={
+        'email': 'user0@bench.test',
+        'password': PASSWORD
+    }).get_json()['tokens']
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+    def insert_comments(worker_id):
+        client = app.test_client()
+        errors = 0
+        for i in range(per_worker):
+            response = client.post('/api/protected/comments', json={
+                'text': 'Комментарий из бенчмарка вставок',
+                'article_id': (worker_id * per_worker + i) % articles + 1
+            }, headers=headers)
+            if response.status_code != 201:
+                errors += 1
+        return errors
+
+    results = {}
+    for name, enabled in (('direct', False), ('batched', True)):
+        comment_batcher.enabled = enabled
+        batches_before = comment_batcher.batches
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            errors = sum(pool.map(insert_comments, range(concurrency)))
+        elapsed = time.perf_counter() - started
+        total = concurrency * per_worker
+        results[name] = {
+            'inserts': total,
+            'errors': errors,
+            'inserts_per_s': round(total / elapsed, 2),
+            'transactions': comment_batcher.batches - batches_before if enabled else total
+        }
+    comment_batcher.enabled = app.config.get('COMMENT_BATCHING', False)
+    return results
+
+
+async def asgi_get(application, path, query=''):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'root_path': '',
+        'query_string': query.encode('utf-8'),
+        'headers': [(b'host', b'bench')],
+        'client': ('127.0.0.1', 0),
+        'server': ('bench', 80)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+def bench_serving(app, connections, per_connection, articles, seed_value):
+    try:
+        from async_api import AsyncAPI
+    except ImportError as e:
+        return {'error': f'асинхронный режим недоступен: {e}'}
+
+    def plan(connection_id):
+        rng = random.Random(seed_value + connection_id)
+        requests = []
+        for _ in range(per_connection):
+            if rng.random() < 0.5:
+                requests.append(('/api/articles', f'page={rng.randint(1, max(1, articles // 10))}&limit=10'))
+            else:
+                requests.append((f'/api/articles/{rng.randint(1, articles)}', ''))
+        return requests
+
+    def sync_connection(connection_id):
+        client = app.test_client()
+        return sum(client.get(f'{path}?{query}').status_code != 200 for path, query in plan(connection_id))
+
+    async def async_connection(application, connection_id):
+        errors = 0
+        for path, query in plan(connection_id):
+            errors += await asgi_get(application, path, query) != 200
+        return errors
+
+    async def run_async():
+        application = AsyncAPI(app)
+        try:
+            results = await asyncio.gather(*(async_connection(application, i) for i in range(connections)))
+        finally:
+            await application.engine.dispose()
+        return sum(results), application.stats()
+
+    results = {'connections': connections}
+    total = connections * per_connection
+
+    response_cache.clear()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        errors = sum(pool.map(sync_connection, range(connections)))
+    elapsed = time.perf_counter() - started
+    results['sync'] = {'requests': total, 'errors': errors, 'throughput_rps': round(total / elapsed, 2)}
+
+    response_cache.clear()
+    started = time.perf_counter()
+    errors, stats = asyncio.run(run_async())
+    elapsed = time.perf_counter() - started
+    results['async'] = {'requests': total, 'errors': errors, 'throughput_rps': round(total / elapsed, 2), **stats}
+    return results
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(int)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def count_query(self, *args):
+        name = getattr(_local, 'endpoint', None)
+        if name:
+            _local.queries += 1
+
+    def call(self, name, send, expected=(200, 201)):
+        _local.endpoint = name
+        _local.queries = 0
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        _local.endpoint = None
+
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            self.queries[name] += _local.queries
+            if response.status_code not in expected:
+                self.errors[name] += 1
+        return response
+
+
+def worker(app, recorder, worker_id, requests_count, users, articles, seed_value):
+    rng = random.Random(seed_value + worker_id)
+    client = app.test_client()
+    email = f'user{worker_id % users}@bench.test'
+
+    response = recorder.call('login', lambda: client.post('/api/auth/login', json={
+        'email': email,
+        'password': PASSWORD
+    }))
+    tokens = response.get_json()['tokens']
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+    operations = [
+        ('list', 40),
+        ('detail', 35),
+        ('create_comment', 15),
+        ('refresh', 5),
+        ('login', 5)
+    ]
+    names = [name for name, _ in operations]
+    weights = [weight for _, weight in operations]
+
+    for _ in range(requests_count):
+        name = rng.choices(names, weights)[0]
+        if name == 'list':
+            page = rng.randint(1, max(1, articles // 10))
+            recorder.call(name, lambda: client.get(f'/api/articles?page={page}&limit=10'))
+        elif name == 'detail':
+            article_id = rng.randint(1, articles)
+            recorder.call(name, lambda: client.get(f'/api/articles/{article_id}'))
+        elif name == 'create_comment':
+            article_id = rng.randint(1, articles)
+            recorder.call(name, lambda: client.post('/api/protected/comments', json={
+                'text': 'Комментарий из бенчмарка',
+                'article_id': article_id
+            }, headers=headers))
+        elif name == 'refresh':
+            response = recorder.call(name, lambda: client.post('/api/auth/refresh', json={
+                'refresh_token': tokens['refresh_token']
+            }))
+            if response.status_code == 200:
+                tokens = response.get_json()['tokens']
+                headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+        else:
+            recorder.call(name, lambda: client.post('/api/auth/login', json={
+                'email': email,
+                'password': PASSWORD
+            }))
+
+
+def run_with_db(args, db_path):
+    app = create_bench_app(db_path)
+    seed_started = time.perf_counter()
+    seed(app, args.users, args.articles, args.comments, args.seed)
+    seed_time = time.perf_counter() - seed_started
+
+    serialization = bench_serialization(app, args.serialize_iterations)
+    comment_inserts = None
+    if args.comment_inserts:
+        comment_inserts = bench_comment_inserts(app, args.concurrency, args.comment_inserts, args.articles)
+    serving = None
+    if args.serving_requests:
+        serving = bench_serving(app, args.serving_connections, args.serving_requests, args.articles, args.seed)
+
+    recorder = Recorder()
+    with app.app_context():
+        event.listen(data_base.engine, 'before_cursor_execute', recorder.count_query)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(worker, app, recorder, worker_id, args.requests, args.users, args.articles, args.seed)
+            for worker_id in range(args.concurrency)
+        ]
+        for future in futures:
+            future.result()
+    wall_time = time.perf_counter() - started
+
+    endpoints = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        endpoints[name] = {
+            'requests': len(latencies),
+            'errors': recorder.errors[name],
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'throughput_rps': round(len(latencies) / wall_time, 2),
+            'queries_per_request': round(recorder.queries[name] / len(latencies), 2)
+        }
+
+    total_requests = sum(result['requests'] for result in endpoints.values())
+    return {
+        'config': {
+            'users': args.users,
+            'articles': args.articles,
+            'comments': args.comments,
+            'concurrency': args.concurrency,
+            'requests_per_worker': args.requests,
+            'serialize_iterations': args.serialize_iterations,
+            'comment_inserts': args.comment_inserts,
+            'serving_connections': args.serving_connections,
+            'serving_requests': args.serving_requests,
+            'seed': args.seed
+        },
+        'startup': app.extensions['startup'],
+        'seed_time_s': round(seed_time, 3),
+        'wall_time_s': round(wall_time, 3),
+        'total': {
+            'requests': total_requests,
+            'errors': sum(result['errors'] for result in endpoints.values()),
+            'throughput_rps': round(total_requests / wall_time, 2)
+        },
+        'endpoints': endpoints,
+        'serialization': serialization,
+        'comment_inserts': comment_inserts,
+        'serving': serving
+    }
+
+
+def run(args):
+    if args.db:
+        return run_with_db(args, args.db)
+    with tempfile.TemporaryDirectory(prefix='blog-bench-') as db_dir:
+        return run_with_db(args, os.path.join(db_dir, 'bench.db'))
+
+
+def print_report(report):
+    print(f"Холодный старт: импорт {report['startup']['import_ms']} мс, "
+          f"create_app {report['startup']['create_app_ms']} мс")
+    print(f"Запросов: {report['total']['requests']}, ошибок: {report['total']['errors']}, "
+          f"{report['total']['throughput_rps']} req/s за {report['wall_time_s']} с")
+    print(f"{'endpoint':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'sql/req':>10}")
+    for name, result in report['endpoints'].items():
+        print(f"{name:<16}{result['requests']:>8}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}{result['throughput_rps']:>10}{result['queries_per_request']:>10}")
+
+    serialization = report['serialization']
+    print(f"Сериализация страницы из {serialization['page_size']} статей "
+          f"(orjson: {'да' if serialization['orjson'] else 'нет'}):")
+    for name in ('stdlib', 'fast'):
+        result = serialization[name]
+        print(f"  {name:<8}{result['pages_per_s']:>10} стр/с{result['mb_per_s']:>10} МБ/с")
+
+    comment_inserts = report['comment_inserts']
+    if comment_inserts:
+        print('Вставка комментариев:')
+        for name in ('direct', 'batched'):
+            result = comment_inserts[name]
+            print(f"  {name:<8}{result['inserts_per_s']:>10} вставок/с{result['transactions']:>8} транзакций"
+                  f"{result['errors']:>6} ошибок")
+
+    serving = report['serving']
+    if serving and 'error' in serving:
+        print(f"Режимы обслуживания: {serving['error']}")
+    elif serving:
+        print(f"Режимы обслуживания ({serving['connections']} соединений):")
+        for name in ('sync', 'async'):
+            result = serving[name]
+            print(f"  {name:<8}{result['throughput_rps']:>10} req/s{result['errors']:>6} ошибок")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный бенчмарк API блога')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='запросов на одного воркера')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--serialize-iterations', type=int, default=200)
+    parser.add_argument('--comment-inserts', type=int, default=100,
+                        help='вставок комментариев на одного воркера (0 — пропустить)')
+    parser.add_argument('--serving-connections', type=int, default=64,
+                        help='одновременных соединений при сравнении sync и async')
+    parser.add_argument('--serving-requests', type=int, default=50,
+                        help='запросов на одно соединение (0 — пропустить)')
+    parser.add_argument('--db', help='путь к файлу SQLite (по умолчанию временный)')
+    parser.add_argument('--output', help='сохранить результаты в JSON')
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
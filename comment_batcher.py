@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from sqlalchemy.exc import SQLAlchemyError
+from models import data_base, Article, Comment
+
+
+class CommentQueueFull(Exception):
+    pass
+
+
+class CommentRejected(Exception):
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+class CommentBatcher:
+    def __init__(self, window_ms=5, max_batch=100, queue_size=1000, timeout=10):
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.enabled = False
+        self.batches = 0
+        self.written = 0
+        self.rejected = 0
+        self._app = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMMENT_BATCHING', False)
+        self.window_ms = app.config.get('COMMENT_BATCH_WINDOW_MS', self.window_ms)
+        self.max_batch = app.config.get('COMMENT_BATCH_MAX', self.max_batch)
+        self.queue_size = app.config.get('COMMENT_BATCH_QUEUE_SIZE', self.queue_size)
+        with self._lock:
+            stale_queue = self._queue if self._thread is not None else None
+            self._thread = None
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._app = app
+        if stale_queue is not None:
+            stale_queue.put(None)
+
+    def submit(self, text, author_name, article_id):
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put_nowait(({
+                'text': text,
+                'author_name': author_name,
+                'article_id': article_id
+            }, future))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise CommentQueueFull('Очередь комментариев переполнена')
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise CommentQueueFull('Очередь комментариев не успела обработать запрос')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'queued': self._queue.qsize(),
+                'batches': self.batches,
+                'written': self.written,
+                'rejected': self.rejected
+            }
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, args=(self._queue, self._app),
+                                                    name='comment-batcher', daemon=True)
+                    self._thread.start()
+
+    def _run(self, jobs, app):
+        stopped = False
+        while not stopped:
+            item = jobs.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window_ms / 1000
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = jobs.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopped = True
+                    break
+                batch.append(item)
+            try:
+                self._flush(app, batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, app, batch):
+        with app.app_context():
+            session = data_base.session
+            article_ids = {data['article_id'] for data, _ in batch}
+            existing = {
+                id for (id,) in session.query(Article.id).filter(Article.id.in_(article_ids))
+            }
+
+            pending = []
+            for data, future in batch:
+                if data['article_id'] not in existing:
+                    future.set_exception(CommentRejected(['Статья с указанным ID не найдена']))
+                    continue
+                comment = Comment(**data)
+                session.add(comment)
+                pending.append((comment, future))
+
+            try:
+                session.flush()
+                results = [comment.to_dict() for comment, _ in pending]
+                session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                for _, future in pending:
+                    future.set_exception(e)
+                return
+
+            with self._lock:
+                self.batches += 1
+                self.written += len(pending)
+            for (_, future), result in zip(pending, results):
+                future.set_result(result)
+
+
+comment_batcher = CommentBatcher()
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from flask import g
+from markupsafe import Markup
+from replica import replica_router
+
+
+class FragmentCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render, tags=()):
+        if replica_router.bypass_cache():
+            return self._render(render)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        replica_router.prefer_primary()
+        value = self._render(render)
+        if g.get('replica_read'):
+            return value
+
+        with self._lock:
+            self._entries[key] = (value, frozenset(tags))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def _render(self, render):
+        value = render()
+        if isinstance(value, str) and not isinstance(value, Markup):
+            value = Markup(value)
+        return value
+
+    def invalidate(self, tag):
+        with self._lock:
+            for key in [key for key, (_, tags) in self._entries.items() if tag in tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+fragment_cache = FragmentCache()
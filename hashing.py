@@ -0,0 +1,124 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+METHOD_DEFAULTS = {
+    'scrypt': ['scrypt', str(2 ** 15), '8', '1'],
+    'pbkdf2': ['pbkdf2', 'sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+}
+
+
+class HashingQueueFull(Exception):
+    pass
+
+
+def normalize_method(method):
+    parts = method.split(':')
+    defaults = METHOD_DEFAULTS.get(parts[0])
+    if defaults is None:
+        return method
+    return ':'.join(parts + defaults[len(parts):])
+
+
+def _mp_context():
+    # fork из многопоточного сервера может унести в дочерний процесс занятые блокировки
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _hash(password, method):
+    return time.time(), generate_password_hash(password, method=method)
+
+
+def _check(hashed_password, password):
+    return time.time(), check_password_hash(hashed_password, password)
+
+
+class PasswordHasher:
+    def __init__(self, method='pbkdf2:sha256:600000', workers=None, queue_depth=64):
+        self.method = method
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_depth = queue_depth
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.queue_depth = app.config.get('PASSWORD_HASH_QUEUE_DEPTH', self.queue_depth)
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def check(self, hashed_password, password):
+        return self._run(_check, hashed_password, password)
+
+    def needs_rehash(self, hashed_password):
+        return hashed_password.split('$', 1)[0] != normalize_method(self.method)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'queue_depth': self.queue_depth,
+                'in_flight': self.submitted - self.completed,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_wait_ms': round(self.wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                'max_wait_ms': round(self.wait_max * 1000, 3)
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingQueueFull('Очередь хеширования паролей переполнена')
+
+        submitted_at = time.time()
+        started_at = submitted_at
+        with self._lock:
+            self.submitted += 1
+
+        try:
+            if not self.workers:
+                started_at, result = func(*args)
+            else:
+                started_at, result = self._get_executor().submit(func, *args).result()
+            return result
+        finally:
+            self._slots.release()
+            wait = max(0.0, started_at - submitted_at)
+            with self._lock:
+                self.completed += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+                    atexit.register(self.shutdown)
+        return self._executor
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import defaultdict, deque
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from models import data_base
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.wall_time = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.slow_queries = 0
+        self.statuses = defaultdict(int)
+        self.buckets = [0] * len(BUCKETS)
+
+
+class Instrumentation:
+    def __init__(self, slow_query_ms=100, slow_query_log_size=50):
+        self.slow_query_ms = slow_query_ms
+        self.endpoints = defaultdict(EndpointStats)
+        self.slow_query_log = deque(maxlen=slow_query_log_size)
+        self.collectors = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.slow_query_ms = app.config.get('SLOW_QUERY_MS', self.slow_query_ms)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        with app.app_context():
+            for engine in data_base.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_query)
+                event.listen(engine, 'after_cursor_execute', self._after_query)
+
+    def register_collector(self, name, stats):
+        self.collectors[name] = stats
+
+    def _start_request(self):
+        g.instrumentation_started = time.perf_counter()
+        g.instrumentation_db_time = 0.0
+        g.instrumentation_queries = 0
+        g.instrumentation_slow_queries = 0
+
+    def _before_query(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('instrumentation_started', []).append(time.perf_counter())
+
+    def _after_query(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['instrumentation_started'].pop()
+        elapsed = time.perf_counter() - started
+
+        if not has_request_context() or 'instrumentation_started' not in g:
+            return
+
+        g.instrumentation_db_time += elapsed
+        g.instrumentation_queries += 1
+        if elapsed * 1000 >= self.slow_query_ms:
+            g.instrumentation_slow_queries += 1
+            with self._lock:
+                self.slow_query_log.append({
+                    'endpoint': request.endpoint,
+                    'statement': statement,
+                    'duration_ms': round(elapsed * 1000, 3)
+                })
+
+    def _finish_request(self, response):
+        if 'instrumentation_started' not in g:
+            return response
+
+        wall_time = time.perf_counter() - g.instrumentation_started
+        db_time = g.instrumentation_db_time
+        queries = g.instrumentation_queries
+        endpoint = request.endpoint or 'unknown'
+
+        with self._lock:
+            stats = self.endpoints[(endpoint, request.method)]
+            stats.count += 1
+            stats.wall_time += wall_time
+            stats.db_time += db_time
+            stats.queries += queries
+            stats.slow_queries += g.instrumentation_slow_queries
+            stats.statuses[response.status_code] += 1
+            for index, bound in enumerate(BUCKETS):
+                if wall_time <= bound:
+                    stats.buckets[index] += 1
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={wall_time * 1000:.3f}, '
+            f'db;dur={db_time * 1000:.3f};desc="{queries} queries"'
+        )
+        return response
+
+    def metrics_view(self):
+        return Response(self.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+    def render_metrics(self):
+        lines = [
+            '# HELP blog_http_requests_total Number of handled HTTP requests.',
+            '# TYPE blog_http_requests_total counter'
+        ]
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for (endpoint, method), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'blog_http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+                        f'status="{status}"}} {count}'
+                    )
+
+            lines += [
+                '# HELP blog_http_request_duration_seconds Request wall time.',
+                '# TYPE blog_http_request_duration_seconds histogram'
+            ]
+            for (endpoint, method), stats in endpoints:
+                labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    lines.append(f'blog_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'blog_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f'blog_http_request_duration_seconds_sum{{{labels}}} {stats.wall_time:.6f}')
+                lines.append(f'blog_http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+            for name, help_text, attribute in (
+                ('blog_db_time_seconds_total', 'Time spent in SQL queries.', 'db_time'),
+                ('blog_db_queries_total', 'Number of executed SQL queries.', 'queries'),
+                ('blog_db_slow_queries_total', 'Number of queries slower than SLOW_QUERY_MS.', 'slow_queries')
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (endpoint, method), stats in endpoints:
+                    value = getattr(stats, attribute)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{endpoint="{_label(endpoint)}",method="{method}"}} {value}')
+
+        for collector, stats in sorted(self.collectors.items()):
+            for key, value in sorted(stats().items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f'blog_{collector}_{key}'
+                lines += [f'# TYPE {name} gauge', f'{name} {value}']
+
+        return '\n'.join(lines) + '\n'
+
+
+instrumentation = Instrumentation()
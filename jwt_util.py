@@ -1,22 +1,27 @@
 import jwt
 import datetime
+import time
+import uuid
 from flask import current_app, request, jsonify
 from functools import wraps
 from models import User
+from token_store import MemoryTokenStore
 
 class JWTManager: 
-    def __init__(self):
+    def __init__(self, token_store=None):
         self.secret_key = 'your-secret-key-change-in-production'
         self.access_token_expires = datetime.timedelta(hours=1)
         self.refresh_token_expires = datetime.timedelta(days=30)
+        self.token_store = token_store or MemoryTokenStore()
     
     def create_access_token(self, user_id, email):
         payload = {
             'user_id': user_id,
             'email': email,
             'exp': datetime.datetime.utcnow() + self.access_token_expires,
-            'iat': datetime.datetime.utcnow(),
-            'type': 'access'
+            'iat': time.time(),
+            'type': 'access',
+            'jti': uuid.uuid4().hex
         }
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
     
@@ -25,29 +30,58 @@ class JWTManager:
             'user_id': user_id,
             'email': email,
             'exp': datetime.datetime.utcnow() + self.refresh_token_expires, 
-            'iat': datetime.datetime.utcnow(),
-            'type': 'refresh'
+            'iat': time.time(),
+            'type': 'refresh',
+            'jti': uuid.uuid4().hex
         }
         return jwt.encode(payload, self.secret_key, algorithm='HS256')
     
     def verify_token(self, token):
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+
+        if self.is_revoked(payload):
+            return None
+        return payload
+
+    def is_revoked(self, payload):
+        jti = payload.get('jti')
+        if jti and self.token_store.is_revoked(jti):
+            return True
+        return self.issued_before_cutoff(payload)
+
+    def issued_before_cutoff(self, payload):
+        return payload.get('iat', 0) < self.token_store.revoked_before(payload.get('user_id'))
+
+    def revoke_token(self, payload):
+        if not payload.get('jti'):
+            return True
+        return self.token_store.revoke(payload['jti'], payload['exp'])
     
     def refresh_tokens(self, refresh_token):
-        payload = self.verify_token(refresh_token)
-        if not payload or payload.get('type') != 'refresh':
+        try:
+            payload = jwt.decode(refresh_token, self.secret_key, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            return None
+        if payload.get('type') != 'refresh':
+            return None
+
+        if self.issued_before_cutoff(payload):
             return None
         
         user = User.query.get(payload['user_id']) 
         if not user:
             return None
 
+        if not self.revoke_token(payload):
+            now = time.time()
+            self.token_store.revoke_user(user.id, now, now + self.refresh_token_expires.total_seconds())
+            return None
+
         return {
             'access_token': self.create_access_token(user.id, user.email),
             'refresh_token': self.create_refresh_token(user.id, user.email),
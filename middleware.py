@@ -1,25 +1,22 @@
 from flask import request, jsonify, g
+from functools import wraps
 from jwt_util import jwt_manager
 from models import User
+from token_cache import token_cache
 import jwt
 import datetime
 
-def jwt_middleware():
-    if request.method == 'OPTIONS':
-        return
-    protected_endpoints = {
-        'api.get_current_user',       
-        'api.create_article_jwt',    
-        'api.update_article_jwt',      
-        'api.delete_article_jwt',      
-        'api.create_comment_jwt',     
-        'api.update_comment_jwt',      
-        'api.delete_comment_jwt'       
-    }
-    
-    if not request.endpoint or request.endpoint not in protected_endpoints:
-        return
-    
+def jwt_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'OPTIONS':
+            error = authenticate()
+            if error is not None:
+                return error
+        return view(*args, **kwargs)
+    return wrapper
+
+def authenticate():
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
         return jsonify({
@@ -28,6 +25,11 @@ def jwt_middleware():
         }), 401
     
     token = auth_header.split(' ')[1]
+    cached = token_cache.get(token)
+    if cached and not jwt_manager.is_revoked(cached[0]):
+        request.current_user = cached[1]
+        return
+
     payload = jwt_manager.verify_token(token)
     
     if not payload:
@@ -36,7 +38,7 @@ def jwt_middleware():
             try:
                 refresh_payload = jwt.decode(refresh_token, jwt_manager.secret_key, algorithms=['HS256'])
                 
-                if refresh_payload.get('type') == 'refresh':
+                if refresh_payload.get('type') == 'refresh' and not jwt_manager.is_revoked(refresh_payload):
                     user = User.query.get(refresh_payload['user_id'])
                     if user:
                         new_access_token = jwt_manager.create_access_token(user.id, user.email)
@@ -47,6 +49,7 @@ def jwt_middleware():
                         
                         new_refresh_token = None
                         if time_until_expiry < datetime.timedelta(days=7):
+                            jwt_manager.revoke_token(refresh_payload)
                             new_refresh_token = jwt_manager.create_refresh_token(user.id, user.email)
                         
                         g.new_access_token = new_access_token
@@ -76,4 +79,4 @@ def jwt_middleware():
             'error': 'Пользователь не найден'
         }), 401
     
-    request.current_user = user
\ No newline at end of file
+    request.current_user = token_cache.set(token, payload, user)
\ No newline at end of file
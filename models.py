@@ -1,32 +1,40 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, selectinload
 from flask_login import UserMixin
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash 
+import math
+from hashing import password_hasher
+from replica import RoutingSession
 
-data_base = SQLAlchemy()
+data_base = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, data_base.Model):
     __tablename__= "user"
 
     id = data_base.Column(data_base.Integer, primary_key = True)
     name = data_base.Column(data_base.String(100), nullable=False)
-    email = data_base.Column(data_base.String(100), nullable=False)
+    email = data_base.Column(data_base.String(100), nullable=False, unique=True, index=True)
     hashed_password = data_base.Column(data_base.String(200), nullable=False)
     date = data_base.Column(data_base.DateTime, default=datetime.utcnow)
     articles = data_base.relationship('Article', backref='author', lazy=True)
 
     def set_password(self, password):
-        self.hashed_password = generate_password_hash(password)
+        self.hashed_password = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.hashed_password, password)
+        if not password_hasher.check(self.hashed_password, password):
+            return False
+        if password_hasher.needs_rehash(self.hashed_password):
+            self.set_password(password)
+        return True
     
     def to_dict(self):
         return {
             "id": self.id,
             "name": self.name,
             "email": self.email,
-            "date": self.date
+            "date": self.date.isoformat() if self.date else None
         }
 
 class Article(data_base.Model):
@@ -38,20 +46,144 @@ class Article(data_base.Model):
     date = data_base.Column(data_base.DateTime, default=datetime.utcnow)
     user_id = data_base.Column(data_base.Integer, data_base.ForeignKey('user.id'), nullable=False)
     category = data_base.Column(data_base.String(50), default='Общая')
+    comment_count = data_base.Column(data_base.Integer, nullable=False, default=0, server_default='0')
+    excerpt = data_base.Column(data_base.String(300))
+    word_count = data_base.Column(data_base.Integer, nullable=False, default=0, server_default='0')
+    reading_time = data_base.Column(data_base.Integer, nullable=False, default=0, server_default='0')
     comment = data_base.relation('Comment', backref='article', lazy='dynamic')
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        data_base.Index('ix_article_category_date', 'category', 'date'),
+        data_base.Index('ix_article_date_id', 'date', 'id'),
+    )
+
+    @classmethod
+    def with_author(cls, query=None, loading='joined'):
+        if query is None:
+            query = cls.query
+        if loading == 'selectin':
+            return query.options(selectinload(cls.author))
+        return query.options(joinedload(cls.author))
+
+    def to_dict(self, fields=None):
+        author = self.author
+        result = {
             "id": self.id,
             "title": self.title,
-            "text": self.text,
+            "excerpt": self.excerpt,
+            "word_count": self.word_count or 0,
+            "reading_time": self.reading_time or 0,
             "date": self.date.isoformat() if self.date else None, 
             "user_id": self.user_id,
-            "author_name": self.author.name if self.author else None,
-            "author_email": self.author.email if self.author else None,
-            "category": self.category
+            "author_name": author.name if author else None,
+            "author_email": author.email if author else None,
+            "category": self.category,
+            "comment_count": self.comment_count or 0
+        }
+        if fields is None or 'text' in fields:
+            result["text"] = self.text
+        if fields is not None:
+            result = {key: result[key] for key in fields if key in result}
+        return result
+
+    def latest_comments(self, limit):
+        return self.comment.order_by(Comment.date.desc(), Comment.id.desc()).limit(limit).all()
+
+    @classmethod
+    def recount_comments(cls):
+        data_base.session.execute(
+            cls.__table__.update().values(comment_count=data_base.select(data_base.func.count(Comment.id))
+                .where(Comment.article_id == cls.id)
+                .scalar_subquery())
+        )
+        data_base.session.commit()
+
+ARTICLE_FIELDS = (
+    'id', 'title', 'text', 'excerpt', 'word_count', 'reading_time', 'date',
+    'user_id', 'author_name', 'author_email', 'category', 'comment_count'
+)
+ARTICLE_SUMMARY_FIELDS = tuple(field for field in ARTICLE_FIELDS if field != 'text')
+
+
+def summarize(text, excerpt_length=200, words_per_minute=200):
+    words = (text or '').split()
+    excerpt = ' '.join(words)
+    if len(excerpt) > excerpt_length:
+        excerpt = excerpt[:excerpt_length].rsplit(' ', 1)[0] + '…'
+    return {
+        'excerpt': excerpt,
+        'word_count': len(words),
+        'reading_time': math.ceil(len(words) / words_per_minute) if words else 0
     }
 
+
+@event.listens_for(Article, 'before_insert')
+@event.listens_for(Article, 'before_update')
+def summarize_article(mapper, connection, target):
+    if inspect(target).attrs.text.history.has_changes() or target.excerpt is None:
+        for name, value in summarize(target.text).items():
+            setattr(target, name, value)
+
+class Category(data_base.Model):
+    __tablename__ = "category"
+
+    name = data_base.Column(data_base.String(50), primary_key=True)
+    article_count = data_base.Column(data_base.Integer, nullable=False, default=0)
+
+    @classmethod
+    def adjust(cls, connection, name, delta):
+        if not name or not delta:
+            return
+        table = cls.__table__
+        result = connection.execute(
+            table.update()
+            .where(table.c.name == name)
+            .values(article_count=table.c.article_count + delta)
+        )
+        if result.rowcount == 0 and delta > 0:
+            connection.execute(table.insert().values(name=name, article_count=delta))
+
+    @classmethod
+    def rebuild(cls):
+        counts = data_base.session.query(Article.category, data_base.func.count(Article.id)) \
+            .group_by(Article.category).all()
+        cls.query.delete()
+        for name, count in counts:
+            if name:
+                data_base.session.add(cls(name=name, article_count=count))
+        data_base.session.commit()
+
+    @classmethod
+    def listed(cls):
+        return cls.query.filter(cls.article_count > 0).order_by(cls.name).all()
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "count": self.article_count
+        }
+
+
+@event.listens_for(Article, 'after_insert')
+def count_inserted_article(mapper, connection, target):
+    Category.adjust(connection, target.category, 1)
+
+
+@event.listens_for(Article, 'after_update')
+def count_updated_article(mapper, connection, target):
+    history = inspect(target).attrs.category.history
+    if not history.has_changes():
+        return
+    for name in history.deleted:
+        Category.adjust(connection, name, -1)
+    for name in history.added:
+        Category.adjust(connection, name, 1)
+
+
+@event.listens_for(Article, 'after_delete')
+def count_deleted_article(mapper, connection, target):
+    Category.adjust(connection, target.category, -1)
+
 class Comment(data_base.Model):
     __tablename__="comment"
 
@@ -61,11 +193,98 @@ class Comment(data_base.Model):
     article_id = data_base.Column(data_base.Integer, data_base.ForeignKey('article.id'), nullable=False)
     author_name = data_base.Column(data_base.String(100), nullable=False)
 
+    __table_args__ = (
+        data_base.Index('ix_comment_article_id_date', 'article_id', 'date'),
+    )
+
     def to_dict(self):
         return{
             "id": self.id,
             "text": self.text,
-            "date": self.date,
+            "date": self.date.isoformat() if self.date else None,
             "article_id": self.article_id,
             "author_name": self.author_name
-        }
\ No newline at end of file
+        }
+
+@event.listens_for(Comment, 'after_insert')
+def count_inserted_comment(mapper, connection, target):
+    table = Article.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == target.article_id)
+        .values(comment_count=table.c.comment_count + 1)
+    )
+
+
+@event.listens_for(Comment, 'after_delete')
+def count_deleted_comment(mapper, connection, target):
+    table = Article.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == target.article_id)
+        .values(comment_count=table.c.comment_count - 1)
+    )
+
+
+class CacheVersion(data_base.Model):
+    __tablename__ = "cache_version"
+
+    name = data_base.Column(data_base.String(50), primary_key=True)
+    version = data_base.Column(data_base.Integer, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, connection, names):
+        table = cls.__table__
+        for name in names:
+            result = connection.execute(
+                table.update()
+                .where(table.c.name == name)
+                .values(version=table.c.version + 1)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(name=name, version=1))
+
+
+def migrate_db():
+    columns = {column['name'] for column in inspect(data_base.engine).get_columns('article')}
+    if 'comment_count' not in columns:
+        with data_base.engine.begin() as connection:
+            connection.execute(data_base.text(
+                'ALTER TABLE article ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0'
+            ))
+        Article.recount_comments()
+
+    if 'excerpt' not in columns:
+        with data_base.engine.begin() as connection:
+            connection.execute(data_base.text('ALTER TABLE article ADD COLUMN excerpt VARCHAR(300)'))
+            connection.execute(data_base.text(
+                'ALTER TABLE article ADD COLUMN word_count INTEGER NOT NULL DEFAULT 0'
+            ))
+            connection.execute(data_base.text(
+                'ALTER TABLE article ADD COLUMN reading_time INTEGER NOT NULL DEFAULT 0'
+            ))
+            table = Article.__table__
+            rows = connection.execute(data_base.select(table.c.id, table.c.text)).all()
+            for id, text in rows:
+                connection.execute(table.update().where(table.c.id == id).values(**summarize(text)))
+
+    indexes = {index['name'] for index in inspect(data_base.engine).get_indexes('user')}
+    if 'ix_user_email' not in indexes:
+        duplicates = data_base.session.scalars(
+            data_base.select(User.email)
+            .group_by(User.email)
+            .having(data_base.func.count(User.id) > 1)
+        ).all()
+        if duplicates:
+            raise ValueError(
+                'Невозможно создать уникальный индекс user.email: '
+                f'повторяющиеся адреса {", ".join(sorted(duplicates))}. '
+                'Объедините или удалите дубликаты и запустите приложение снова'
+            )
+
+    for table in data_base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(data_base.engine, checkfirst=True)
+
+    if not Category.query.first():
+        Category.rebuild()
@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_MAX = 100
+
+
+def page_max(config):
+    return config.get('ARTICLES_PAGE_MAX', DEFAULT_PAGE_MAX)
+
+
+def encode_cursor(date, id):
+    raw = json.dumps([date.isoformat() if date else None, id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise ValueError
+        return (datetime.fromisoformat(date) if date is not None else None), id
+    except (ValueError, TypeError):
+        raise ValueError('Невалидный cursor')
+
+
+def keyset_paginate(query, date_column, id_column, cursor=None, limit=10, order='desc'):
+    if limit < 1:
+        raise ValueError('Параметр limit должен быть положительным')
+
+    if order == 'asc':
+        query = query.order_by(date_column.asc(), id_column.asc())
+    else:
+        query = query.order_by(date_column.desc(), id_column.desc())
+
+    if cursor:
+        date, id = decode_cursor(cursor)
+        query = query.filter(_after(date_column, id_column, date, id, order))
+
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, date_column.key), getattr(last, id_column.key))
+
+    return items, next_cursor
+
+
+def _after(date_column, id_column, date, id, order):
+    # SQLite сортирует NULL раньше любых дат: при order=desc строки без даты
+    # идут в конце, при order=asc - в начале.
+    if order == 'asc':
+        if date is None:
+            return or_(and_(date_column.is_(None), id_column > id), date_column.isnot(None))
+        return or_(date_column > date, and_(date_column == date, id_column > id))
+
+    if date is None:
+        return and_(date_column.is_(None), id_column < id)
+    return or_(date_column < date, and_(date_column == date, id_column < id), date_column.is_(None))
@@ -0,0 +1,134 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache, wraps
+from flask import current_app, request
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f'Превышен лимит запросов, повторите через {retry_after} с')
+        self.retry_after = retry_after
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    count, _, period = rate.partition('/')
+    period = period.strip().rstrip('s')
+    if period not in PERIODS or not count.strip().isdigit() or int(count) < 1:
+        raise ValueError(f'Невалидный лимит: {rate}')
+    return int(count), PERIODS[period]
+
+
+class MemoryBucketStore:
+    def __init__(self, shards=16, sweep_every=1024):
+        self.sweep_every = sweep_every
+        self._shards = [({}, threading.Lock(), [0]) for _ in range(shards)]
+
+    def consume(self, key, capacity, period, cost=1):
+        now = time.monotonic()
+        refill_rate = capacity / period
+        buckets, lock, operations = self._shards[hash(key) % len(self._shards)]
+
+        with lock:
+            operations[0] += 1
+            if operations[0] % self.sweep_every == 0:
+                self._sweep(buckets, now)
+
+            tokens, updated, expires_at = buckets.get(key, (capacity, now, now))
+            if expires_at <= now:
+                tokens = capacity
+            else:
+                tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+            if tokens < cost:
+                return False, (cost - tokens) / refill_rate
+
+            tokens -= cost
+            buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            return True, 0.0
+
+    def clear(self):
+        for buckets, lock, _ in self._shards:
+            with lock:
+                buckets.clear()
+
+    def __len__(self):
+        return sum(len(buckets) for buckets, _, _ in self._shards)
+
+    def _sweep(self, buckets, now):
+        for key in [key for key, (_, _, expires_at) in buckets.items() if expires_at <= now]:
+            del buckets[key]
+
+
+class RateLimiter:
+    def __init__(self, store=None):
+        self.store = store or MemoryBucketStore()
+        self.enabled = True
+        self.limits = {}
+        self.allowed = defaultdict(int)
+        self.limited = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.limits = dict(app.config.get('RATELIMIT_LIMITS', {}))
+        if app.config.get('RATELIMIT_STORE') is not None:
+            self.store = app.config['RATELIMIT_STORE']
+
+    def limit(self, rate, per='ip'):
+        parse_rate(rate)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled:
+                    self.check(request.endpoint, rate, per)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def check(self, endpoint, rate, per):
+        capacity, period = parse_rate(self.limits.get(endpoint, rate))
+        if per == 'user' and getattr(request, 'current_user', None) is not None:
+            identity = f'user:{request.current_user.id}'
+        else:
+            identity = f'ip:{request.remote_addr}'
+
+        allowed, retry_after = self.store.consume(f'{endpoint}|{identity}', capacity, period)
+        with self._lock:
+            if allowed:
+                self.allowed[endpoint] += 1
+            else:
+                self.limited[endpoint] += 1
+        if not allowed:
+            current_app.logger.info('Лимит запросов превышен: %s %s', endpoint, identity)
+            raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+
+    def reset(self):
+        self.store.clear()
+        with self._lock:
+            self.allowed.clear()
+            self.limited.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'keys': len(self.store),
+                'allowed': sum(self.allowed.values()),
+                'limited': sum(self.limited.values())
+            }
+            for endpoint, count in self.limited.items():
+                stats[f'limited_{endpoint.replace(".", "_")}'] = count
+            return stats
+
+
+rate_limiter = RateLimiter()
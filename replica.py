@@ -0,0 +1,130 @@
+import itertools
+import threading
+import time
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+
+class ReplicaRouter:
+    def __init__(self, max_lag=5):
+        self.max_lag = max_lag
+        self.sticky_seconds = max_lag
+        self.replicas = ()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self._sticky = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.replicas = tuple(app.config.get('REPLICA_BINDS', ()))
+        # REPLICA_MAX_LAG - на сколько секунд реплика может отставать от основной базы
+        # (для копируемого файла - интервал копирования плюс время копии). Столько же
+        # писавший клиент читает с основной базы, если REPLICA_STICKY_SECONDS не задан.
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', self.max_lag)
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', self.max_lag)
+
+        with app.app_context():
+            from models import data_base
+            for name in self.replicas:
+                event.listen(data_base.engines[name], 'connect', _read_only)
+
+    def client_keys(self):
+        keys = [f'ip:{request.remote_addr}']
+        user = getattr(request, 'current_user', None) or g.get('_login_user')
+        if user is not None and user.is_authenticated:
+            keys.append(f'user:{user.id}')
+        return keys
+
+    def stick(self):
+        now = time.monotonic()
+        with self._lock:
+            if has_request_context():
+                for key in self.client_keys():
+                    self._sticky[key] = now + self.sticky_seconds
+            if len(self._sticky) > 4096:
+                self._sticky = {key: until for key, until in self._sticky.items() if until > now}
+
+    def is_sticky(self):
+        now = time.monotonic()
+        return any(self._sticky.get(key, 0) > now for key in self.client_keys())
+
+    def bypass_cache(self):
+        return bool(self.replicas) and has_request_context() and self.is_sticky()
+
+    def prefer_primary(self):
+        if self.replicas and has_request_context():
+            g.use_primary = True
+
+    def read_bind(self, session, clause):
+        if not self.replicas or not has_request_context():
+            return None
+        if not getattr(clause, 'is_select', False) or getattr(clause, '_for_update_arg', None) is not None:
+            return None
+
+        if 'use_primary' not in session.info:
+            session.info['use_primary'] = self.is_sticky()
+        if session.info['use_primary'] or session.info.get('wrote') or g.get('use_primary'):
+            with self._lock:
+                self.primary_reads += 1
+            return None
+
+        g.replica_read = True
+        name = self.replicas[next(self._counter) % len(self.replicas)]
+        with self._lock:
+            self.replica_reads += 1
+        return session._db.engines[name]
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'replicas': len(self.replicas),
+                'replica_reads': self.replica_reads,
+                'primary_reads': self.primary_reads,
+                'sticky_clients': sum(1 for until in self._sticky.values() if until > now)
+            }
+
+
+replica_router = ReplicaRouter()
+
+
+def _read_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA query_only=ON')
+    finally:
+        cursor.close()
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            engine = replica_router.read_bind(self, clause)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_flushed(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def stick_after_commit(session):
+    if session.info.pop('wrote', False):
+        session.info['use_primary'] = True
+        replica_router.stick()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def forget_rolled_back_write(session):
+    session.info.pop('wrote', None)
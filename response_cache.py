@@ -0,0 +1,212 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, g, has_app_context, request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import data_base, CacheVersion
+from replica import replica_router
+import sqlite_profile
+
+
+class ResponseCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.epoch = uuid.uuid4().hex
+        self.shared = False
+        self.database = None
+        self.versions = {}
+        self.version_reads = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._responses = OrderedDict()
+        self._connection = None
+        self._connection_pid = None
+        self._data_version = None
+        self._shared_versions = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        uri = app.config['SQLALCHEMY_DATABASE_URI']
+        self.shared = (app.config.get('RESPONSE_CACHE_SHARED_VERSIONS', True)
+                       and sqlite_profile.is_file_database(uri))
+        if self.shared:
+            self.epoch = uri
+            with app.app_context():
+                self.database = data_base.engine.url.database
+        with self._lock:
+            self._close_connection()
+        self.clear()
+
+    def bump(self, *tables):
+        with self._lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+
+    def table_versions(self, *tables):
+        versions = self.all_versions()
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def all_versions(self):
+        if has_app_context() and '_table_versions' in g:
+            return g._table_versions
+        with self._lock:
+            versions = self._read_shared_versions() if self.shared else dict(self.versions)
+        if has_app_context():
+            g._table_versions = versions
+        return versions
+
+    def _read_shared_versions(self):
+        # PRAGMA data_version меняется только после коммита другого соединения,
+        # поэтому таблица cache_version перечитывается лишь после чьей-то записи.
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.database, check_same_thread=False)
+            self._connection.execute('PRAGMA query_only=ON')
+            self._connection_pid = os.getpid()
+            self._data_version = None
+
+        data_version = self._connection.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self._data_version:
+            try:
+                rows = self._connection.execute('SELECT name, version FROM cache_version').fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+            self._shared_versions = dict(rows)
+            self._data_version = data_version
+            self.version_reads += 1
+        return self._shared_versions
+
+    def _close_connection(self):
+        if self._connection is not None and self._connection_pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._data_version = None
+        self._shared_versions = {}
+
+    def etag(self, tables, path=None, versions=None):
+        if path is None:
+            path = request.full_path
+        if versions is None:
+            versions = self.table_versions(*tables)
+        versions = ','.join(f'{table}:{version}' for table, version in zip(tables, versions))
+        key = f'{self.epoch}|{path}|{versions}'
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def lookup(self, etag):
+        with self._lock:
+            entry = self._responses.get(etag)
+            if entry is not None:
+                self._responses.move_to_end(etag)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def store(self, etag, body, mimetype):
+        with self._lock:
+            self._responses[etag] = (body, mimetype)
+            while len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+
+    def mark_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._responses),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'version_reads': self.version_reads
+            }
+
+    def cached(self, *tables):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                etag = self.etag(tables)
+
+                if etag in request.if_none_match:
+                    self.mark_not_modified()
+                    response = Response(status=304)
+                    response.set_etag(etag)
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+
+                bypass = replica_router.bypass_cache()
+                entry = None if bypass else self.lookup(etag)
+                if entry is not None:
+                    body, mimetype = entry
+                    response = Response(body, mimetype=mimetype)
+                else:
+                    if not bypass:
+                        replica_router.prefer_primary()
+                    response = make_response(view(*args, **kwargs))
+                    if (bypass or response.status_code != 200 or response.is_streamed
+                            or g.get('replica_read')):
+                        return response
+                    self.store(etag, response.get_data(), response.mimetype)
+
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def track_flushed_tables(session, flush_context):
+    changed = session.info.setdefault('changed_tables', set())
+    dirty = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    for obj in list(session.new) + dirty + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            changed.add(table)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_bulk_tables(orm_execute_state):
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete) or not state.bind_mapper:
+        return
+    changed = state.session.info.setdefault('changed_tables', set())
+    changed.add(state.bind_mapper.local_table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def persist_table_versions(session):
+    if not response_cache.shared:
+        return
+    session.flush()
+    changed = session.info.get('changed_tables')
+    if changed:
+        CacheVersion.bump(session.connection(), sorted(changed))
+
+
+@event.listens_for(Session, 'after_commit')
+def bump_committed_tables(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        response_cache.bump(*changed)
+        if has_app_context():
+            g.pop('_table_versions', None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_rolled_back_tables(session):
+    session.info.pop('changed_tables', None)
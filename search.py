@@ -0,0 +1,96 @@
+import re
+from sqlalchemy import text, select, literal_column
+from sqlalchemy.exc import OperationalError
+from models import data_base, Article
+
+FTS_TABLE = 'article_fts'
+
+
+def _normalized(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON article BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, {_normalized('new.title')}, {_normalized('new.text')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON article BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, text ON article BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, {_normalized('new.title')}, {_normalized('new.text')});
+    END""",
+]
+
+
+class ArticleSearch:
+    def __init__(self):
+        self._available = {}
+
+    def create_index(self):
+        engine = data_base.engine
+        if engine.dialect.name != 'sqlite':
+            self._available[engine] = False
+            return False
+
+        try:
+            with engine.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"
+                ), {'name': FTS_TABLE}).first()
+                for statement in FTS_SCHEMA:
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text(
+                        f"INSERT INTO {FTS_TABLE}(rowid, title, text) "
+                        f"SELECT id, {_normalized('title')}, {_normalized('text')} FROM article"
+                    ))
+        except OperationalError:
+            self._available[engine] = False
+            return False
+
+        self._available[engine] = True
+        return True
+
+    def is_available(self):
+        engine = data_base.engine
+        if engine not in self._available:
+            if engine.dialect.name != 'sqlite':
+                self._available[engine] = False
+            else:
+                with engine.connect() as conn:
+                    exists = conn.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"
+                    ), {'name': FTS_TABLE}).first()
+                self._available[engine] = exists is not None
+        return self._available[engine]
+
+    def match_expression(self, search):
+        search = search.replace('ё', 'е').replace('Ё', 'Е')
+        terms = re.findall(r'\w+', search)
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def filter(self, query, search):
+        expression = self.match_expression(search)
+        if not expression or not self.is_available():
+            return query.filter(Article.title.ilike(f'%{search}%')), None
+
+        matches = select(
+            literal_column('rowid').label('id'),
+            literal_column(f'bm25({FTS_TABLE})').label('rank')
+        ).select_from(text(FTS_TABLE)).where(
+            text(f'{FTS_TABLE} MATCH :match').bindparams(match=expression)
+        ).subquery()
+
+        return query.join(matches, Article.id == matches.c.id), matches.c.rank
+
+
+article_search = ArticleSearch()
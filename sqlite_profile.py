@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from models import data_base
+
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY'
+}
+
+DEFAULT_POOL = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_pre_ping': False
+}
+
+
+def is_file_database(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def _pragma_hook(pragmas, extra_hook):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+        if extra_hook:
+            extra_hook(dbapi_connection)
+    return on_connect
+
+
+def pool_options(app):
+    return {name: app.config.get(f'SQLITE_{name.upper()}', value) for name, value in DEFAULT_POOL.items()}
+
+
+def connect_listener(app, uri):
+    pragmas = dict(DEFAULT_PRAGMAS)
+    if not is_file_database(uri):
+        pragmas.pop('journal_mode')
+        pragmas.pop('mmap_size')
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    return _pragma_hook(pragmas, app.config.get('SQLITE_CONNECT_HOOK'))
+
+
+def init_app(app):
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+
+    if is_file_database(uri):
+        options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        for name, value in pool_options(app).items():
+            options.setdefault(name, value)
+
+    data_base.init_app(app)
+
+    if make_url(uri).get_backend_name() != 'sqlite':
+        return
+
+    on_connect = connect_listener(app, uri)
+    with app.app_context():
+        for engine in data_base.engines.values():
+            event.listen(engine, 'connect', on_connect)
@@ -0,0 +1,29 @@
+from flask import Response, current_app, stream_with_context
+
+
+def stream_json(envelope, key, items):
+    dumps = current_app.json.dumps
+
+    def generate():
+        head = dumps(envelope)
+        if envelope:
+            yield head[:-1] + ',' + dumps(key) + ':['
+        else:
+            yield '{' + dumps(key) + ':['
+        for index, item in enumerate(items):
+            if index:
+                yield ','
+            yield dumps(item.to_dict())
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def stream_ndjson(items):
+    dumps = current_app.json.dumps
+
+    def generate():
+        for item in items:
+            yield dumps(item.to_dict()) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,54 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, init_db
+from models import data_base
+
+
+def make_app(path, **config):
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'HTML_VIEWS': False,
+        'CORS_RESOURCES': None,
+        'RATELIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'TESTING': True,
+        **config
+    })
+
+
+@contextmanager
+def count_statements(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = data_base.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path / 'blog.db')
+    with app.app_context():
+        init_db()
+    yield app
+    with app.app_context():
+        data_base.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def headers(client):
+    response = client.post('/api/auth/login', json={'email': 'developer@test.com', 'password': '123456'})
+    return {'Authorization': f"Bearer {response.get_json()['tokens']['access_token']}"}
+
+
+def test_create_article_with_null_category(client, headers):
+    response = client.post('/api/protected/articles', json={'title': 'Заголовок', 'text': 'Текст', 'category': None},
+                           headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['article']['category'] == 'Общее'
+
+
+def test_update_article_with_null_category_keeps_category(client, headers):
+    response = client.put('/api/protected/articles/2', json={'title': 'Заголовок', 'text': 'Текст', 'category': None},
+                          headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['article']['category'] == 'Наука и технологии'
+
+
+def test_non_string_category_is_rejected(client, headers):
+    response = client.post('/api/protected/articles', json={'title': 'Заголовок', 'text': 'Текст', 'category': 5},
+                           headers=headers)
+
+    assert response.status_code == 400
@@ -0,0 +1,32 @@
+from app import init_db
+from conftest import make_app
+from models import data_base, Comment
+
+
+def make_batching_app(path):
+    app = make_app(path, COMMENT_BATCHING=True)
+    with app.app_context():
+        init_db()
+    return app
+
+
+def post_comment(app, text):
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': 'developer@test.com', 'password': '123456'})
+    headers = {'Authorization': f"Bearer {response.get_json()['tokens']['access_token']}"}
+    return client.post('/api/protected/comments', json={'text': text, 'article_id': 1}, headers=headers)
+
+
+def test_batched_comments_survive_second_app(tmp_path):
+    first = make_batching_app(tmp_path / 'first.db')
+    assert post_comment(first, 'Первый').status_code == 201
+
+    second = make_batching_app(tmp_path / 'second.db')
+    response = post_comment(second, 'Второй')
+
+    assert response.status_code == 201
+    with second.app_context():
+        assert [comment.text for comment in Comment.query.all()] == ['Второй']
+        data_base.engine.dispose()
+    with first.app_context():
+        data_base.engine.dispose()
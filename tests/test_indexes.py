@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from conftest import make_app
+from models import data_base
+
+LEGACY_SCHEMA = '''
+CREATE TABLE user (
+    id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, email VARCHAR(100) NOT NULL,
+    hashed_password VARCHAR(200) NOT NULL, date DATETIME
+);
+CREATE TABLE article (
+    id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, text TEXT NOT NULL, date DATETIME,
+    user_id INTEGER NOT NULL REFERENCES user (id), category VARCHAR(50)
+);
+CREATE TABLE comment (
+    id INTEGER PRIMARY KEY, text TEXT NOT NULL, date DATETIME, author_name VARCHAR(100) NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES article (id)
+);
+'''
+
+
+def query_plan(statement, *parameters):
+    with data_base.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return ' '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('statement, parameters, index', [
+    ('SELECT id FROM article WHERE category = ? ORDER BY date DESC LIMIT 10',
+     ('Общее',), 'ix_article_category_date'),
+    ('SELECT id FROM article ORDER BY date DESC, id DESC LIMIT 10',
+     (), 'ix_article_date_id'),
+    ('SELECT id FROM comment WHERE article_id = ? ORDER BY date DESC',
+     (1,), 'ix_comment_article_id_date'),
+    ('SELECT id FROM user WHERE email = ?',
+     ('developer@test.com',), 'ix_user_email')
+])
+def test_planner_uses_index(app, statement, parameters, index):
+    with app.app_context():
+        plan = query_plan(statement, *parameters)
+
+    assert index in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def create_legacy_database(path, emails):
+    connection = sqlite3.connect(path)
+    connection.executescript(LEGACY_SCHEMA)
+    connection.executemany(
+        "INSERT INTO user (name, email, hashed_password) VALUES ('Автор', ?, '-')",
+        [(email,) for email in emails]
+    )
+    connection.execute("INSERT INTO article (title, text, user_id, category) VALUES ('Статья', 'Текст', 1, 'Общее')")
+    connection.commit()
+    connection.close()
+
+
+def test_migration_adds_indexes_to_legacy_database(tmp_path):
+    path = tmp_path / 'legacy.db'
+    create_legacy_database(path, ['first@test.com', 'second@test.com'])
+
+    app = make_app(path)
+    with app.app_context():
+        plan = query_plan('SELECT id FROM user WHERE email = ?', 'first@test.com')
+        with pytest.raises(IntegrityError):
+            with data_base.engine.begin() as connection:
+                connection.exec_driver_sql(
+                    "INSERT INTO user (name, email, hashed_password) VALUES ('Копия', 'first@test.com', '-')"
+                )
+        data_base.engine.dispose()
+
+    assert 'ix_user_email' in plan
+
+
+def test_migration_reports_duplicate_emails(tmp_path):
+    path = tmp_path / 'legacy.db'
+    create_legacy_database(path, ['same@test.com', 'other@test.com', 'same@test.com'])
+
+    with pytest.raises(ValueError, match='same@test.com'):
+        make_app(path)
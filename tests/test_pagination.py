@@ -0,0 +1,97 @@
+import asyncio
+import base64
+
+import pytest
+
+from async_api import AsyncAPI
+from conftest import count_statements
+from models import data_base, User, Article, Comment
+
+
+@pytest.fixture
+def authors(app):
+    with app.app_context():
+        for number in range(30):
+            user = User(name=f'Автор {number}', email=f'author{number}@test.com', hashed_password='-')
+            data_base.session.add(Article(title=f'Статья {number}', text='Текст', author=user))
+        data_base.session.commit()
+
+
+@pytest.mark.parametrize('loading', ['joined', 'selectin'])
+def test_article_list_statement_count_does_not_grow_with_page_size(app, client, authors, loading):
+    counts = []
+    for limit in (2, 20):
+        with count_statements(app) as statements:
+            response = client.get(f'/api/articles?limit={limit}&loading={loading}')
+        assert response.status_code == 200
+        assert len(response.get_json()['articles']) == limit
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_cursor_page_statement_count_does_not_grow_with_page_size(app, client, authors):
+    counts = []
+    for limit in (2, 20):
+        with count_statements(app) as statements:
+            response = client.get(f'/api/articles?cursor=&limit={limit}')
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.fixture
+def comments(app):
+    with app.app_context():
+        for number in range(7):
+            data_base.session.add(Comment(text=f'Комментарий {number}', author_name='reader@test.com', article_id=1))
+        data_base.session.commit()
+        data_base.session.execute(data_base.update(Comment).where(Comment.id.in_([2, 4, 5])).values(date=None))
+        data_base.session.commit()
+
+
+@pytest.mark.parametrize('order', ['desc', 'asc'])
+def test_cursor_pages_include_rows_without_date(client, comments, order):
+    seen, cursor = [], ''
+    while True:
+        response = client.get(f'/api/comments?order={order}&limit=2&cursor={cursor}')
+        assert response.status_code == 200
+        data = response.get_json()
+        seen += [comment['id'] for comment in data['comments']]
+        if not data['next_cursor']:
+            break
+        cursor = data['next_cursor']
+
+    assert sorted(seen) == list(range(1, 8))
+    assert len(seen) == 7
+
+
+def encode_raw_cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_cursor_without_date_continues_after_dated_rows(client, comments):
+    response = client.get(f"/api/comments?cursor={encode_raw_cursor('[null, 5]')}")
+
+    assert response.status_code == 200
+    assert [comment['id'] for comment in response.get_json()['comments']] == [4, 2]
+
+
+@pytest.mark.parametrize('raw', ['["вчера", 1]', '[5, 1]', '["2024-01-01T00:00:00", "1"]', '[null, true]'])
+def test_cursor_with_invalid_date_or_id(client, comments, raw):
+    response = client.get(f'/api/comments?cursor={encode_raw_cursor(raw)}')
+
+    assert response.status_code == 400
+
+
+
+def test_sync_and_async_article_lists_share_limit_bound(app, client, authors):
+    app.config['ARTICLES_PAGE_MAX'] = 10
+    api = AsyncAPI(app)
+    payload = asyncio.run(api.get_articles({'limit': '1000'}))
+    asyncio.run(api.engine.dispose())
+
+    expected = client.get('/api/articles?limit=1000').get_json()
+    assert len(payload['articles']) == len(expected['articles']) == 10
+    assert payload['pages'] == expected['pages'] == 4
@@ -0,0 +1,117 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import init_db
+from conftest import make_app
+from models import data_base
+
+MAX_LAG = 0.2
+
+
+def article_title(path, id):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT title FROM article WHERE id = ?', (id,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+    app = make_app(primary)
+    with app.app_context():
+        init_db()
+        data_base.engine.dispose()
+
+    source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+    source.backup(target)
+    target.execute("UPDATE article SET title = 'С реплики' WHERE id = 1")
+    target.execute("INSERT INTO comment (text, author_name, article_id, date) "
+                   "VALUES ('С реплики', 'reader@test.com', 1, CURRENT_TIMESTAMP)")
+    target.commit()
+    source.close()
+    target.close()
+
+    app = make_app(primary, SQLALCHEMY_BINDS={'replica': f'sqlite:///{replica}'},
+                   REPLICA_BINDS=['replica'], REPLICA_MAX_LAG=MAX_LAG, REPLICA_STICKY_SECONDS=60,
+                   HTML_VIEWS=True)
+    yield app, primary, replica
+    with app.app_context():
+        for engine in data_base.engines.values():
+            engine.dispose()
+
+
+def make_client(app, address):
+    client = app.test_client()
+    client.environ_base['REMOTE_ADDR'] = address
+    return client
+
+
+def login(client):
+    response = client.post('/api/auth/login', json={'email': 'developer@test.com', 'password': '123456'})
+    return {'Authorization': f"Bearer {response.get_json()['tokens']['access_token']}"}
+
+
+def update_title(client, headers, title):
+    response = client.put('/api/protected/articles/1', json={'title': title, 'text': 'Новый текст'},
+                          headers=headers)
+    assert response.status_code == 200
+
+
+def comment_texts(client, headers=None):
+    response = client.get('/api/comments?article_id=1', headers=headers)
+    return [comment['text'] for comment in response.get_json()['comments']]
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica_app):
+    app, primary, replica = replica_app
+    reader = make_client(app, '10.0.1.1')
+    author = make_client(app, '10.0.1.2')
+
+    assert comment_texts(reader) == ['С реплики']
+
+    headers = login(author)
+    update_title(author, headers, 'Обновлено')
+
+    assert article_title(primary, 1) == 'Обновлено'
+    assert article_title(replica, 1) == 'С реплики'
+
+    assert comment_texts(author, headers) == []
+    assert comment_texts(reader) == ['С реплики']
+
+
+def test_cached_responses_are_never_built_from_replica(replica_app):
+    app, _, _ = replica_app
+    reader = make_client(app, '10.0.2.1')
+    author = make_client(app, '10.0.2.2')
+    headers = login(author)
+    time.sleep(MAX_LAG * 1.5)
+
+    response = reader.get('/api/articles/1')
+    etag = response.headers['ETag']
+    assert response.get_json()['article']['title'] == 'Первая новость'
+    assert 'Первая новость' in reader.get('/news/1').get_data(as_text=True)
+
+    update_title(author, headers, 'Обновлено')
+    time.sleep(MAX_LAG * 1.5)
+
+    assert author.get('/api/articles/1', headers=headers).get_json()['article']['title'] == 'Обновлено'
+    assert 'Обновлено' in author.get('/news/1').get_data(as_text=True)
+
+    response = reader.get('/api/articles/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['article']['title'] == 'Обновлено'
+    assert 'Обновлено' in reader.get('/news/1').get_data(as_text=True)
+
+
+def test_replica_connections_are_read_only(replica_app):
+    app, _, _ = replica_app
+    with app.app_context():
+        with data_base.engines['replica'].connect() as connection:
+            with pytest.raises(OperationalError, match='readonly'):
+                connection.exec_driver_sql("UPDATE article SET title = 'Запись' WHERE id = 1")
@@ -0,0 +1,32 @@
+import sqlite3
+
+from conftest import count_statements
+from models import data_base
+
+
+def test_not_modified_response_runs_no_sql(app, client):
+    etag = client.get('/api/articles').headers['ETag']
+
+    with count_statements(app) as statements:
+        response = client.get('/api/articles', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert statements == []
+
+
+def test_write_from_another_process_changes_etag(app, client):
+    response = client.get('/api/articles/1')
+    etag = response.headers['ETag']
+
+    with app.app_context():
+        path = data_base.engine.url.database
+    connection = sqlite3.connect(path)
+    connection.execute("UPDATE article SET title = 'Из другого процесса' WHERE id = 1")
+    connection.execute("UPDATE cache_version SET version = version + 1 WHERE name = 'article'")
+    connection.commit()
+    connection.close()
+
+    response = client.get('/api/articles/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['article']['title'] == 'Из другого процесса'
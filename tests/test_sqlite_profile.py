@@ -0,0 +1,53 @@
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from conftest import make_app
+from models import data_base
+
+BUSY_TIMEOUT_MS = 2000
+
+
+def test_file_database_uses_wal_profile(app):
+    with app.app_context():
+        with data_base.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+            assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+
+
+def test_reader_is_not_blocked_by_open_write_transaction(tmp_path):
+    app = make_app(tmp_path / 'blog.db', SQLITE_PRAGMAS={'busy_timeout': BUSY_TIMEOUT_MS})
+    with app.app_context():
+        engine = data_base.engine
+
+    writer = engine.raw_connection()
+    try:
+        cursor = writer.cursor()
+        cursor.execute('BEGIN EXCLUSIVE')
+        cursor.execute("INSERT INTO user (name, email, hashed_password) VALUES ('Писатель', 'writer@test.com', '-')")
+
+        result = {}
+
+        def read():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    result['count'] = connection.exec_driver_sql('SELECT COUNT(*) FROM user').scalar()
+            except OperationalError as e:
+                result['error'] = e
+            result['elapsed'] = time.perf_counter() - started
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(BUSY_TIMEOUT_MS / 1000 * 2)
+
+        assert not reader.is_alive()
+        assert 'error' not in result
+        assert result['count'] == 0
+        assert result['elapsed'] < BUSY_TIMEOUT_MS / 1000 / 4
+        writer.rollback()
+    finally:
+        writer.close()
+        engine.dispose()
@@ -0,0 +1,36 @@
+import time
+
+from jwt_util import JWTManager
+from token_store import MemoryTokenStore
+
+
+def test_token_uses_standard_iat_claim(app):
+    manager = JWTManager()
+    with app.app_context():
+        payload = manager.verify_token(manager.create_access_token(1, 'developer@test.com'))
+
+    assert 'issued_at' not in payload
+    assert isinstance(payload['iat'], float)
+
+
+def test_user_cutoff_revokes_older_tokens_only(app):
+    manager = JWTManager()
+    with app.app_context():
+        old = manager.create_access_token(1, 'developer@test.com')
+        now = time.time()
+        manager.token_store.revoke_user(1, now, now + 60)
+        new = manager.create_access_token(1, 'developer@test.com')
+
+        assert manager.verify_token(old) is None
+        assert manager.verify_token(new) is not None
+
+
+def test_user_cutoff_is_pruned_after_token_lifetime():
+    store = MemoryTokenStore()
+    now = time.time()
+    store.revoke_user(1, now - 120, now - 60)
+    store.revoke_user(2, now, now + 60)
+
+    assert store.revoked_before(1) == 0
+    assert store.revoked_before(2) == now
+    assert list(store._user_cutoff) == [2]
@@ -0,0 +1,27 @@
+import pytest
+
+from app import init_db
+from conftest import count_statements, make_app
+from models import data_base
+
+
+@pytest.fixture
+def views_app(tmp_path):
+    app = make_app(tmp_path / 'blog.db', HTML_VIEWS=True)
+    with app.app_context():
+        init_db()
+    yield app
+    with app.app_context():
+        data_base.engine.dispose()
+
+
+@pytest.mark.parametrize('path', ['/', '/articles', '/news/1'])
+def test_repeated_anonymous_page_view_runs_no_sql(views_app, path):
+    client = views_app.test_client()
+    assert client.get(path).status_code == 200
+
+    with count_statements(views_app) as statements:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert statements == []
@@ -0,0 +1,51 @@
+import heapq
+import threading
+import time
+
+
+class MemoryTokenStore:
+    def __init__(self):
+        self._revoked = {}
+        self._expiry = []
+        self._user_cutoff = {}
+        self._cutoff_expiry = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, exp):
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            if jti in self._revoked:
+                return False
+            if exp > now:
+                self._revoked[jti] = exp
+                heapq.heappush(self._expiry, (exp, jti))
+            return True
+
+    def is_revoked(self, jti):
+        exp = self._revoked.get(jti)
+        return exp is not None and exp > time.time()
+
+    def revoke_user(self, user_id, before, until):
+        with self._lock:
+            self._evict(time.time())
+            cutoff, expires = self._user_cutoff.get(user_id, (0, 0))
+            self._user_cutoff[user_id] = (max(before, cutoff), max(until, expires))
+            heapq.heappush(self._cutoff_expiry, (max(until, expires), user_id))
+
+    def revoked_before(self, user_id):
+        cutoff, expires = self._user_cutoff.get(user_id, (0, 0))
+        return cutoff if expires > time.time() else 0
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def _evict(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            exp, jti = heapq.heappop(self._expiry)
+            if self._revoked.get(jti) == exp:
+                del self._revoked[jti]
+        while self._cutoff_expiry and self._cutoff_expiry[0][0] <= now:
+            expires, user_id = heapq.heappop(self._cutoff_expiry)
+            if self._user_cutoff.get(user_id, (0, 0))[1] == expires:
+                del self._user_cutoff[user_id]
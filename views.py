@@ -0,0 +1,388 @@
+import re
+from datetime import date
+from urllib.parse import unquote
+from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from markupsafe import Markup
+from models import data_base, User, Article, Comment, Category
+from jwt_util import jwt_manager
+from token_cache import token_cache
+from hashing import HashingQueueFull
+from comment_batcher import comment_batcher, CommentQueueFull, CommentRejected
+from fragment_cache import fragment_cache
+from response_cache import response_cache
+from replica import replica_router
+
+views_bp = Blueprint('views', __name__)
+
+login_manager = LoginManager()
+login_manager.login_view = 'views.login_page'
+login_manager.login_message = 'Пожалуйста, войдите для доступа к этой странице.'
+
+
+def init_app(app):
+    login_manager.init_app(app)
+    app.register_blueprint(views_bp)
+
+@views_bp.errorhandler(HashingQueueFull)
+@views_bp.errorhandler(CommentQueueFull)
+def hashing_queue_full(e):
+    flash('Сервер перегружен, повторите попытку позже', 'error')
+    return redirect(request.url)
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+@views_bp.before_request
+def before_request():
+    if not current_user.is_authenticated:
+        jwt_token = request.cookies.get('jwt_token')
+        if jwt_token:
+            cached = token_cache.get(jwt_token)
+            if cached and not jwt_manager.is_revoked(cached[0]):
+                login_user(cached[1])
+                return
+
+            payload = jwt_manager.verify_token(jwt_token)
+            if payload:
+                user = User.query.get(payload['user_id'])
+                if user:
+                    login_user(token_cache.set(jwt_token, payload, user))
+
+@views_bp.route("/index")
+@views_bp.route("/")
+def index():
+    today = date.today()
+
+    def render_cards():
+        articles = Article.with_author().order_by(Article.date.desc()).limit(6).all()
+        return render_template('_index_cards.html', articles=articles, current_date=today)
+
+    cards = fragment_cache.get_or_render(
+        ('index', response_cache.table_versions('article'), today),
+        render_cards,
+        tags=('articles',)
+    )
+    return render_template('index.html', cards=cards)
+
+@views_bp.route("/about")
+def about():
+    return render_template('about.html')
+
+@views_bp.route("/contact")
+def contact():
+    return render_template('contact.html')
+
+@views_bp.route("/feedback", methods=['GET', 'POST'])
+def feedback():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        message = request.form.get('message')
+
+        errors = []
+        
+        if not name:
+            errors.append('Имя обязательно для заполнения')
+        
+        if not email:
+            errors.append('Email обязателен для заполнения')
+        elif not re.match(r'^[a-zA-Z0-9.]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+            errors.append('Введите корректный email адрес')
+        
+        if not message:
+            errors.append('Сообщение обязательно для заполнения')
+        
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+        else:
+            flash('Сообщение успешно отправлено!', 'success')
+            return render_template('feedback.html', 
+                                 name=name, 
+                                 email=email, 
+                                 message=message,
+                                 submitted=True)
+    
+    return render_template('feedback.html')
+        
+@views_bp.route('/news/<int:id>', methods=['GET', 'POST'])
+def news_article(id):
+    if request.method == 'POST':
+        Article.query.get_or_404(id)
+
+        if not current_user.is_authenticated:
+            flash('Для добавления комментариев необходимо войти в систему', 'error')
+            return redirect(url_for('views.login_page', next=request.url))
+        
+        comment_text = request.form.get('comment_text')
+        
+        if comment_text and comment_batcher.enabled:
+            try:
+                comment_batcher.submit(comment_text, current_user.email, id)
+            except CommentRejected as e:
+                for error in e.errors:
+                    flash(error, 'error')
+                return redirect(url_for('views.news_article', id=id))
+            replica_router.stick()
+            fragment_cache.invalidate(f'comments:{id}')
+            flash('Комментарий успешно добавлен!', 'success')
+            return redirect(url_for('views.news_article', id=id))
+        elif comment_text:
+            comment = Comment(
+                text=comment_text,
+                author_name=current_user.email, 
+                article_id=id
+            ) 
+            
+            data_base.session.add(comment)
+            data_base.session.commit()
+            fragment_cache.invalidate(f'comments:{id}')
+            flash('Комментарий успешно добавлен!', 'success')
+            return redirect(url_for('views.news_article', id=id))
+        else:
+            flash('Заполните текст комментария', 'error')
+            return redirect(url_for('views.news_article', id=id))
+
+    today = date.today()
+
+    def render_article():
+        article = Article.query.get_or_404(id)
+        return {
+            'title': article.title,
+            'author_id': article.user_id,
+            'html': Markup(render_template('_article_body.html', article=article, current_date=today))
+        }
+
+    def render_comments():
+        comments = Comment.query.filter_by(article_id=id).order_by(Comment.date.desc()).all()
+        return {
+            'count': len(comments),
+            'html': Markup(render_template('_comments.html', comments=comments))
+        }
+
+    article = fragment_cache.get_or_render(
+        ('article', id, response_cache.table_versions('article', 'user'), today),
+        render_article,
+        tags=(f'article:{id}',)
+    )
+    comments = fragment_cache.get_or_render(
+        ('comments', id, response_cache.table_versions('comment')),
+        render_comments,
+        tags=(f'comments:{id}',)
+    )
+    return render_template('article.html',
+                         title=article['title'],
+                         article_id=id,
+                         author_id=article['author_id'],
+                         article_body=article['html'],
+                         comment_count=comments['count'],
+                         comments_html=comments['html'])
+
+@views_bp.route("/articles")
+@views_bp.route("/articles/<category>")
+def articles_list(category=None):
+    if category is None:
+        category = request.args.get('category', '').strip()
+    
+    if category:
+        category = unquote(category)
+    
+    categories = fragment_cache.get_or_render(
+        ('categories', response_cache.table_versions('article', 'category')),
+        lambda: [cat.name for cat in Category.listed()],
+        tags=('articles',)
+    )
+    page = request.args.get('page', 1, type=int)
+    today = date.today()
+
+    if category and category not in categories:
+        flash(f'Категория "{category}" не найдена', 'error')
+        articles_html = render_template('_articles_list_body.html',
+                                        articles=[],
+                                        pagination=None,
+                                        current_category=category,
+                                        categories=categories)
+    else:
+        def render_articles():
+            query = Article.with_author()
+            if category:
+                query = query.filter_by(category=category)
+            pagination = query.order_by(Article.date.desc()).paginate(page=page, per_page=10, error_out=False)
+            return render_template('_articles_list_body.html',
+                                   articles=pagination.items,
+                                   pagination=pagination,
+                                   current_category=category,
+                                   categories=categories,
+                                   current_date=today)
+
+        user_id = current_user.id if current_user.is_authenticated else None
+        articles_html = fragment_cache.get_or_render(
+            ('articles', category, page, user_id, today, response_cache.table_versions('article', 'user')),
+            render_articles,
+            tags=('articles',)
+        )
+    
+    return render_template('articles_list.html', 
+                         articles_html=articles_html,
+                         current_category=category,
+                         categories=categories)
+
+@views_bp.route("/create_article", methods=['GET', 'POST'])
+@login_required
+def create_article():
+    if request.method == 'POST':
+        title = request.form.get('title')
+        text = request.form.get('text')
+        category = request.form.get('category', 'general')
+
+        if title and text:
+            article = Article(
+                title=title,
+                text=text,
+                category=category,
+                user_id=current_user.id,
+            )
+
+            data_base.session.add(article)
+            data_base.session.commit()
+            fragment_cache.invalidate('articles')
+            flash('Статья создана!', 'success')
+            return redirect(url_for('views.articles_list'))
+        
+        else:
+            flash('Заполните обязательные поля', 'error')
+
+    return render_template('create_article.html')
+
+@views_bp.route("/edit_article/<int:id>", methods=['GET', 'POST'])
+@login_required
+def edit_article(id):
+    article = Article.query.get_or_404(id)
+
+    if article.author != current_user:
+        flash('У вас нет прав для редактирования этой статьи', 'error')
+        return redirect(url_for('views.news_article', id=id))
+    
+    if request.method == 'POST':
+        article.title = request.form.get('title')
+        article.text = request.form.get('text')
+        article.category = request.form.get('category', 'general')
+
+        data_base.session.commit()
+        fragment_cache.invalidate('articles')
+        fragment_cache.invalidate(f'article:{id}')
+        flash('Статья обновлена', 'success')
+        return redirect(url_for("views.news_article", id=id))
+
+    return render_template('edit_article.html', article=article)
+
+@views_bp.route('/delete-article/<int:id>')
+@login_required
+def delete_article(id):
+    article = Article.query.get_or_404(id)
+
+    if article.author != current_user:
+        flash('У вас нет прав для удаления статьи', 'error')
+        return redirect(url_for('views.news_article', id=id))
+    
+    Comment.query.filter_by(article_id=id).delete()
+    data_base.session.delete(article)
+    data_base.session.commit()
+    fragment_cache.invalidate('articles')
+    fragment_cache.invalidate(f'article:{id}')
+    fragment_cache.invalidate(f'comments:{id}')
+    flash('Статья успешно удалена', 'success')
+    return redirect(url_for('views.articles_list'))
+
+@views_bp.route('/login', methods=['GET', 'POST'])
+def login_page():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        
+        user = User.query.filter_by(email=email).first()
+        
+        if user and user.check_password(password):
+            data_base.session.commit()
+            login_user(user)
+            
+            access_token = jwt_manager.create_access_token(user.id, user.email)
+            refresh_token = jwt_manager.create_refresh_token(user.id, user.email)
+            
+            flash('Вы успешно вошли в систему!', 'success')
+            next_page = request.args.get('next')
+            
+            response = redirect(next_page or url_for('views.index'))
+            response.set_cookie('jwt_token', access_token, max_age=3600, httponly=True)
+            response.set_cookie('refresh_token', refresh_token, max_age=2592000, httponly=True)
+            
+            return response
+        else:
+            flash('Неверный email или пароль', 'error')
+    
+    return render_template('login.html')
+
+@views_bp.route("/register", methods=['GET', 'POST'])
+def register():
+    if request.method=='POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+
+        errors = []
+
+        if not name or not email or not password:
+            errors.append('Все поля обязательны для заполнения')
+        
+        if password != confirm_password:
+            errors.append('Пароли не совпадают')
+        
+        if User.query.filter_by(email=email).first():
+            errors.append('Пользователь с таким email уже существует')
+        
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+        else:
+            user = User(
+                name=name,
+                email=email
+            )
+            user.set_password(password)
+            data_base.session.add(user)
+            data_base.session.commit()
+            
+            login_user(user)
+            access_token = jwt_manager.create_access_token(user.id, user.email)
+            refresh_token = jwt_manager.create_refresh_token(user.id, user.email)
+            
+            flash("Вы зарегистрированы", 'success')
+            
+            response = redirect(url_for('views.index'))
+            response.set_cookie('jwt_token', access_token, max_age=3600, httponly=True)
+            response.set_cookie('refresh_token', refresh_token, max_age=2592000, httponly=True)
+            
+            return response
+        
+    return render_template('register.html')
+
+@views_bp.route("/logout")
+@login_required
+def logout():
+    for cookie in ('jwt_token', 'refresh_token'):
+        payload = jwt_manager.verify_token(request.cookies.get(cookie, ''))
+        if payload:
+            jwt_manager.revoke_token(payload)
+
+    logout_user()
+    flash("Вы вышли", 'success')
+    
+    response = redirect(url_for('views.index'))
+    response.set_cookie('jwt_token', '', expires=0)
+    response.set_cookie('refresh_token', '', expires=0)
+    
+    return response
+